@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Performance Benchmark Suite
+
+Repeatable benchmarks for the converter, pathfinding and trace replay on
+seeded synthetic data (see generate.py). Results can be saved as a named
+baseline and later runs compared against it.
+
+Benchmarks:
+    convert      rows/sec and peak RSS per extractor, store and timeline size
+    pathfinding  latency per search depth on a synthetic machine
+    replay       events/sec replaying a random walk through a deterministic
+                 and a nondeterministic synthetic machine
+
+Usage:
+    python bench.py [options]
+
+Options:
+    -h, --help              Print this help and exit
+    --only <names>          Comma separated benchmarks to run (default: all)
+    --rows <sizes>          Timeline sizes in rows (default: 10000,100000)
+    --extractors <names>    Converter scripts (default: all in converter/scripts)
+    --stores <names>        Converter stores (default: memory,sqlite)
+    --states <count>        Synthetic machine states (default: 200)
+    --branching <count>     Outgoing transitions per state (default: 3)
+    --depths <depths>       Pathfinding depths (default: 1,2,3,4,5)
+    --events <count>        Replay events (default: 1000000)
+    --ambiguity <ratio>     Nondeterministic states in the second replay machine (default: 0.3)
+    --repeat <count>        Runs per measurement, best is kept (default: 3)
+    --seed <seed>           Generator seed (default: 42)
+    --save <name>           Save results to baselines/<name>.json
+    --compare <name>        Compare results with baselines/<name>.json
+    --threshold <ratio>     Allowed regression before failing (default: 0.10)
+
+Example:
+    python bench.py --only convert --rows 1000000 --save main
+    python bench.py --only convert --rows 1000000 --compare main
+"""
+
+import sys
+import os
+import io
+import json
+import time
+import platform
+import tempfile
+import multiprocessing
+from contextlib import redirect_stdout
+from datetime import datetime
+from types import SimpleNamespace
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from generate import DEFAULT_SEED, generate_timeline, generate_machine, random_walk
+
+# ==== CONSTANTS ====
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CONVERTER_DIR = os.path.join(BENCH_DIR, "..", "reconfsm", "converter")
+FSM_DIR = os.path.join(BENCH_DIR, "..", "reconfsm", "fsm")
+DATA_DIR = os.path.join(BENCH_DIR, ".data")
+BASELINES_DIR = os.path.join(BENCH_DIR, "baselines")
+BENCHMARKS = ("convert", "pathfinding", "replay")
+
+# Metrics where a larger value is better; all others are better when smaller
+HIGHER_IS_BETTER = ("rows_per_sec", "events_per_sec")
+
+sys.path.insert(0, os.path.abspath(CONVERTER_DIR))
+sys.path.insert(0, os.path.abspath(FSM_DIR))
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def timeline_file(rows, seed):
+    """
+    Generated timelines are cached in .data/ since large ones take a while.
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"timeline_{rows}_{seed}.csv")
+
+    if not os.path.exists(path):
+        print(f"Generating {rows} row timeline...")
+        partial = f"{path}.partial"
+        generate_timeline(partial, rows, seed=seed)
+        os.replace(partial, path)
+
+    return path
+
+
+def _convert_worker(csv_file, script_type, store, queue):
+    import converter
+
+    extract_function = converter.load_script(script_type)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        start_time = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            converter.generate_json(csv_file, output_dir, extract_function,
+                                    script_type, store=store)
+        duration = time.perf_counter() - start_time
+
+    queue.put((duration, peak_rss_mb()))
+
+
+def run_convert(csv_file, script_type, store):
+    """
+    Each conversion runs in a fresh interpreter so the peak RSS belongs to
+    that conversion alone.
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_convert_worker,
+                              args=(csv_file, script_type, store, queue))
+    process.start()
+    process.join()
+
+    if process.exitcode != 0:
+        raise RuntimeError(
+            f"conversion of '{csv_file}' with {script_type} failed")
+
+    return queue.get()
+
+
+def bench_convert(options, results):
+    import converter
+
+    extractors = options["extractors"] or sorted(
+        converter.get_available_scripts())
+
+    for rows in options["rows"]:
+        csv_file = timeline_file(rows, options["seed"])
+
+        for script_type in extractors:
+            for store in options["stores"]:
+                runs = [run_convert(csv_file, script_type, store)
+                        for _ in range(options["repeat"])]
+                duration = min(run[0] for run in runs)
+                peaks = [run[1] for run in runs if run[1] is not None]
+
+                key = f"convert/{script_type}/{store}/{rows}"
+                results[key] = {
+                    "seconds": duration,
+                    "rows_per_sec": rows / duration if duration > 0 else 0.0
+                }
+                if peaks:
+                    results[key]["peak_rss_mb"] = max(peaks)
+
+                print_result(key, results[key])
+
+
+def synthetic_machine(options, ambiguity=0.0):
+    config = generate_machine(
+        options["states"], options["branching"], options["seed"],
+        ambiguity=ambiguity)
+    machine = SimpleNamespace(
+        name=config["name"],
+        states=config["states"],
+        initial_state=config["initial_state"],
+        transitions_data=config["transitions"]
+    )
+    return config, machine
+
+
+def bench_pathfinding(options, results):
+    from pathfinding import pathfinding_simulation
+
+    config, machine = synthetic_machine(options)
+    dest_state = config["states"][-1]
+
+    for depth in options["depths"]:
+        timings = []
+        for _ in range(options["repeat"]):
+            start_time = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                pathfinding_simulation(machine, dest_state, depth)
+            timings.append(time.perf_counter() - start_time)
+
+        key = f"pathfinding/{config['name']}/depth_{depth}"
+        results[key] = {"latency_ms": min(timings) * 1000}
+        print_result(key, results[key])
+
+
+def bench_replay(options, results):
+    from replay import build_lookup, replay_triggers
+
+    ambiguities = [0.0]
+    if options["ambiguity"] > 0:
+        ambiguities.append(options["ambiguity"])
+
+    for ambiguity in ambiguities:
+        config, machine = synthetic_machine(options, ambiguity)
+        table = build_lookup(machine)
+        walk = random_walk(config, options["events"], options["seed"])
+
+        timings = []
+        for _ in range(options["repeat"]):
+            start_time = time.perf_counter()
+            result = replay_triggers(table, machine.initial_state, walk)
+            timings.append(time.perf_counter() - start_time)
+
+        # An ambiguous walk may stop early, only the events replayed count
+        duration = min(timings)
+        key = f"replay/{config['name']}/{len(walk)}"
+        results[key] = {
+            "seconds": duration,
+            "events_per_sec": result["events"] / duration if duration > 0 else 0.0,
+            "peak_candidates": result["peak_candidates"]
+        }
+        print_result(key, results[key])
+
+
+def print_result(key, metrics):
+    values = ", ".join(f"{name}={value:,.2f}" for name,
+                       value in metrics.items())
+    print(f"{key}: {values}")
+
+
+def compare_results(results, baseline, threshold):
+    """
+    Print the change of every metric present in both runs and return the
+    number of regressions larger than threshold.
+    """
+    regressions = 0
+    print(f"\nComparison with baseline (threshold {threshold:.0%}):")
+
+    for key in sorted(results):
+        if key not in baseline:
+            continue
+
+        for name, value in results[key].items():
+            previous = baseline[key].get(name)
+            if not previous:
+                continue
+
+            change = (value - previous) / previous
+            worse = -change if name in HIGHER_IS_BETTER else change
+            status = "REGRESSION" if worse > threshold else "ok"
+            if worse > threshold:
+                regressions += 1
+
+            print(f"  {key} {name}: {previous:,.2f} -> {value:,.2f} "
+                  f"({change:+.1%}) {status}")
+
+    return regressions
+
+
+def parse_list(value, cast=str):
+    return [cast(item) for item in value.split(",") if item]
+
+
+def parse_options(args):
+    options = {
+        "only": list(BENCHMARKS),
+        "rows": [10000, 100000],
+        "extractors": None,
+        "stores": ["memory", "sqlite"],
+        "states": 200,
+        "branching": 3,
+        "depths": [1, 2, 3, 4, 5],
+        "events": 1000000,
+        "ambiguity": 0.3,
+        "repeat": 3,
+        "seed": DEFAULT_SEED,
+        "save": None,
+        "compare": None,
+        "threshold": 0.10
+    }
+    parsers = {
+        "only": parse_list,
+        "rows": lambda value: parse_list(value, int),
+        "extractors": parse_list,
+        "stores": parse_list,
+        "states": int,
+        "branching": int,
+        "depths": lambda value: parse_list(value, int),
+        "events": int,
+        "ambiguity": float,
+        "repeat": int,
+        "seed": int,
+        "save": str,
+        "compare": str,
+        "threshold": float
+    }
+
+    if "-h" in args or "--help" in args:
+        print(__doc__.strip())
+        sys.exit(0)
+
+    i = 0
+    while i < len(args):
+        name = args[i][2:].replace("-", "_") if args[i].startswith("--") else None
+        if name not in parsers or i + 1 >= len(args):
+            print(f"Error: Unknown or incomplete option '{args[i]}'")
+            sys.exit(1)
+
+        try:
+            options[name] = parsers[name](args[i+1])
+        except ValueError:
+            print(f"Error: Invalid value for {args[i]}: '{args[i+1]}'")
+            sys.exit(1)
+        i += 2
+
+    for name in options["only"]:
+        if name not in BENCHMARKS:
+            print(f"Error: Unknown benchmark '{name}'")
+            print(f"Available benchmarks: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+
+    from converter import STORES
+    for store in options["stores"]:
+        if store not in STORES:
+            print(f"Error: Unknown store '{store}'")
+            print(f"Available stores: {', '.join(STORES)}")
+            sys.exit(1)
+
+    if options["repeat"] < 1:
+        print("Error: repeat must be at least 1")
+        sys.exit(1)
+
+    return options
+
+
+def main():
+    options = parse_options(sys.argv[1:])
+
+    baseline = None
+    if options["compare"]:
+        baseline_file = os.path.join(
+            BASELINES_DIR, f"{options['compare']}.json")
+        if not os.path.exists(baseline_file):
+            print(f"Error: Baseline '{baseline_file}' not found")
+            sys.exit(1)
+        with open(baseline_file, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    benchmarks = {
+        "convert": bench_convert,
+        "pathfinding": bench_pathfinding,
+        "replay": bench_replay
+    }
+    for name in options["only"]:
+        benchmarks[name](options, results)
+
+    if options["save"]:
+        os.makedirs(BASELINES_DIR, exist_ok=True)
+        baseline_file = os.path.join(BASELINES_DIR, f"{options['save']}.json")
+        with open(baseline_file, "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {
+                    "date": datetime.now().isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "seed": options["seed"]
+                },
+                "results": results
+            }, f, indent=4)
+        print(f"\nBaseline saved to: {baseline_file}")
+
+    if baseline is not None:
+        regressions = compare_results(results, baseline, options["threshold"])
+        if regressions:
+            print(f"\n{regressions} regression(s) above threshold")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
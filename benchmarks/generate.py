@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Synthetic Data Generator
+
+Seeded generators for realistic Plaso timeline CSVs and for synthetic state
+machines, used by the benchmark suite. The same seed and parameters always
+produce the same output.
+
+Usage:
+    python generate.py timeline <output_csv> -n <rows> [--sites <count>] [--seed <seed>]
+    python generate.py machine <output_json> -s <states> -b <branching> [-a <ambiguity>] [--seed <seed>]
+
+Example:
+    python generate.py timeline timeline_1m.csv -n 1000000
+    python generate.py machine machine_500.json -s 500 -b 4
+"""
+
+import sys
+import csv
+import json
+import random
+from datetime import datetime, timedelta
+
+# ==== CONSTANTS ====
+HEADER = ["datetime", "timestamp_desc", "source", "source_long",
+          "message", "parser", "display_name", "tag"]
+START_TIME = datetime(2025, 5, 30, 8, 0, 0)
+DEFAULT_SEED = 42
+
+SEARCH_ENGINES = [
+    ("www.google.com", "https://www.google.com/search?q="),
+    ("duckduckgo.com", "https://duckduckgo.com/?t=h_&q="),
+    ("search.yahoo.com", "https://search.yahoo.com/search?p="),
+]
+WORDS = ["forensic", "timeline", "plaso", "ubuntu", "install", "error", "python",
+         "recipe", "weather", "download", "driver", "update", "news", "flight"]
+FILE_TYPES = ["zip", "pdf", "deb", "tar.gz", "exe", "docx"]
+SNAP_APPS = ["firefox", "discord", "snap-store", "spotify", "code", "vlc"]
+GNOME_APPS = ["Calculator", "Nautilus", "TextEditor", "Terminal", "Settings"]
+SHUTDOWN_COMMANDS = ["/usr/sbin/poweroff", "/usr/sbin/shutdown now",
+                     "/usr/sbin/init 0", "/usr/sbin/shutdown -h 23:30"]
+NOISE = [
+    ("LOG", "Log File", "[systemd  pid: 1] Starting sysstat-collect.service - system activity accounting tool...", "text/syslog"),
+    ("LOG", "Systemd journal", "reo [systemd  pid: 1] Finished sysstat-collect.service - system activity accounting tool.", "systemd_journal"),
+    ("LOG", "Systemd journal", "reo [kernel] audit: type=1400 apparmor=\"STATUS\" operation=\"profile_replace\"", "systemd_journal"),
+    ("FILE", "File stat", "/home/user/.cache/tracker3/files/meta.db-wal Type: file", "filestat"),
+    ("REG", "Bash History", "ls -la /home/user/Downloads", "bash_history"),
+]
+
+
+def _web_row(rng, sites):
+    kind = rng.random()
+
+    if kind < 0.12:
+        host, prefix = rng.choice(SEARCH_ENGINES)
+        query = "+".join(rng.sample(WORDS, rng.randint(1, 3)))
+        message = (f"{prefix}{query} ({query.replace('+', ' ')} - Search) [count: 1] "
+                   f"Host: {host} Visit from: https://{host}/ Transition: LINK")
+
+    elif kind < 0.15:
+        name = f"file_{rng.randrange(1000)}.{rng.choice(FILE_TYPES)}"
+        message = (f"https://downloads.example.com/pub/{name} ({name}) [count: 0] "
+                   f"Host: downloads.example.com Transition: DOWNLOAD")
+
+    else:
+        site = rng.randrange(sites)
+        depth = site % 4
+        path = "/".join(f"p{(site >> (3 * i)) % 50}" for i in range(depth))
+        url = f"https://www.site{site % max(1, sites // 8)}.com/{path}"
+        transition = rng.choice(("TYPED", "LINK", "LINK", "LINK", "REDIRECT"))
+        message = (f"{url} (Page {site}) [count: {rng.randint(1, 9)}] "
+                   f"Host: www.site{site % max(1, sites // 8)}.com Transition: {transition}")
+
+    return "Last Visited Time", "WEBHIST", "Firefox History", message, "sqlite/firefox_history"
+
+
+def _application_row(rng, running):
+    if running and rng.random() < 0.5:
+        scope = running.pop(rng.randrange(len(running)))
+        message = (f"reo [systemd  pid: 1386] {scope}: Consumed "
+                   f"{rng.uniform(0.1, 900):.3f}s CPU time.")
+    else:
+        if rng.random() < 0.6:
+            app = rng.choice(SNAP_APPS)
+            scope = f"snap.{app}.{app}-{rng.getrandbits(32):08x}.scope"
+        else:
+            app = rng.choice(GNOME_APPS)
+            scope = f"app-gnome-org.gnome.{app}-{rng.randint(1000, 99999)}.scope"
+        running.append(scope)
+        message = f"reo [systemd  pid: 1386] Started {scope} - Application launched by gnome-shell."
+
+    return "Content Modification Time", "LOG", "Systemd journal", message, "systemd_journal"
+
+
+def _shutdown_row(rng):
+    kind = rng.random()
+
+    if kind < 0.5:
+        command = rng.choice(SHUTDOWN_COMMANDS)
+        message = (f"reo [sudo  pid: {rng.randint(1000, 9999)}] user : TTY=pts/0 ; "
+                   f"PWD=/home/user ; USER=root ; COMMAND={command}")
+    elif kind < 0.85:
+        message = "reo [systemd-journald  pid: 312] Journal stopped"
+    else:
+        message = ("reo [systemd-journald  pid: 312] File /var/log/journal/6aef1e8d/system.journal "
+                   "corrupted or uncleanly shut down, renaming and replacing.")
+
+    return "Content Modification Time", "LOG", "Systemd journal", message, "systemd_journal"
+
+
+def generate_timeline(output_csv, rows, sites=None, seed=DEFAULT_SEED):
+    """
+    Write <rows> Plaso CSV rows: Firefox history, systemd journal application
+    scopes, shutdown lines and unrelated noise, in increasing time order.
+    <sites> controls the number of distinct web pages (and so web states);
+    by default it grows with the number of rows.
+    """
+    rng = random.Random(seed)
+    if sites is None:
+        sites = max(100, rows // 20)
+
+    running = []
+    current = START_TIME
+
+    with open(output_csv, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(HEADER)
+
+        for _ in range(rows):
+            current += timedelta(microseconds=rng.randrange(2_000_000))
+            kind = rng.random()
+
+            if kind < 0.45:
+                desc, source, source_long, message, parser = _web_row(rng, sites)
+                display_name = "OS:/home/user/snap/firefox/common/.mozilla/firefox/x.default/places.sqlite"
+            elif kind < 0.65:
+                desc, source, source_long, message, parser = _application_row(
+                    rng, running)
+                display_name = "EXT:/var/log/journal/6aef1e8d/user-1000.journal"
+            elif kind < 0.66:
+                desc, source, source_long, message, parser = _shutdown_row(rng)
+                display_name = "EXT:/var/log/journal/6aef1e8d/system.journal"
+            else:
+                source, source_long, message, parser = rng.choice(NOISE)
+                desc = "Content Modification Time"
+                display_name = "EXT:/var/log/syslog"
+
+            writer.writerow([f"{current.isoformat(timespec='microseconds')}+00:00",
+                             desc, source, source_long, message, parser, display_name, "-"])
+
+
+def generate_machine(states, branching, seed=DEFAULT_SEED, triggers=None, ambiguity=0.0):
+    """
+    Build a machine config with <states> states, a chain through all of them
+    (so every state is reachable) and up to <branching> outgoing transitions
+    per state with distinct triggers, drawn from a pool of <triggers> names.
+    With <ambiguity> > 0 that fraction of states also reuses one of its
+    triggers for a second destination, making the machine nondeterministic
+    like the web machines.
+    """
+    rng = random.Random(seed)
+    names = [f"State {i}" for i in range(states)]
+    if triggers is None:
+        triggers = max(1, branching * 4)
+    trigger_names = [f"trigger_{i}" for i in range(max(triggers, branching + 1))]
+
+    transitions = []
+    for i, source in enumerate(names):
+        used_triggers = rng.sample(trigger_names, min(branching, len(trigger_names)))
+        dests = set()
+
+        if i + 1 < states:
+            dests.add(names[i + 1])
+        while len(dests) < min(branching, states - 1):
+            dest = rng.choice(names)
+            if dest != source:
+                dests.add(dest)
+
+        for trigger, dest in zip(used_triggers, sorted(dests)):
+            transitions.append(
+                {"trigger": trigger, "source": source, "dest": dest})
+
+        if ambiguity > 0 and dests and rng.random() < ambiguity:
+            extra = [name for name in names if name not in dests and name != source]
+            if extra:
+                transitions.append({"trigger": used_triggers[0], "source": source,
+                                    "dest": rng.choice(extra)})
+
+    name = f"synthetic_{states}x{branching}"
+    if ambiguity > 0:
+        name += f"_a{ambiguity:g}"
+
+    return {
+        "name": name,
+        "initial_state": names[0] if names else "unknown",
+        "states": names,
+        "triggers": sorted({t["trigger"] for t in transitions}),
+        "transitions": transitions,
+        "functions": {}
+    }
+
+
+def random_walk(machine_config, events, seed=DEFAULT_SEED):
+    """
+    A trigger sequence of <events> valid steps from the initial state. Walks
+    restart from the initial state when they reach a state with no exits.
+    """
+    rng = random.Random(seed)
+    outgoing = {state: [] for state in machine_config["states"]}
+    for transition in machine_config["transitions"]:
+        outgoing[transition["source"]].append(
+            (transition["trigger"], transition["dest"]))
+
+    initial = machine_config["initial_state"]
+    state = initial
+    walk = []
+
+    while len(walk) < events:
+        choices = outgoing[state]
+        if not choices:
+            if state == initial:
+                break
+            state = initial
+            continue
+        trigger, state = rng.choice(choices)
+        walk.append(trigger)
+
+    return walk
+
+
+def _option(args, flag, default, cast=int):
+    if flag not in args:
+        return default
+
+    position = args.index(flag)
+    if position + 1 >= len(args):
+        print(f"Error: {flag} requires a value")
+        sys.exit(1)
+
+    try:
+        return cast(args[position + 1])
+    except ValueError:
+        print(f"Error: {flag} must be a number")
+        sys.exit(1)
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ('timeline', 'machine'):
+        print("Usage: python generate.py timeline <output_csv> -n <rows> [--sites <count>] [--seed <seed>]")
+        print("       python generate.py machine <output_json> -s <states> -b <branching> [-a <ambiguity>] [--seed <seed>]")
+        sys.exit(1)
+
+    kind = sys.argv[1]
+    output_file = sys.argv[2]
+    args = sys.argv[3:]
+    seed = _option(args, '--seed', DEFAULT_SEED)
+
+    if kind == 'timeline':
+        rows = _option(args, '-n', 10000)
+        sites = _option(args, '--sites', None)
+        generate_timeline(output_file, rows, sites, seed)
+        print(f"Generated {rows} rows: {output_file}")
+    else:
+        states = _option(args, '-s', 100)
+        branching = _option(args, '-b', 3)
+        ambiguity = _option(args, '-a', 0.0, float)
+        machine_config = generate_machine(states, branching, seed, ambiguity=ambiguity)
+        with open(output_file, "w", encoding="utf-8") as json_file:
+            json.dump({"synthetic_machine": [machine_config]}, json_file, indent=4)
+        print(f"Generated machine with {states} states "
+              f"and {len(machine_config['transitions'])} transitions: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,24 +6,39 @@ A program that converts CSV files into state machine JSON configurations.
 Takes command line arguments for the CSV file and extraction script type.
 
 Usage:
-    python convert.py <csv_file> <script_type>
+    python convert.py <csv_file> <script_type> [--index] [--store memory|sqlite] [--memory-budget <MB>]
+    python convert.py batch <csv_dir_or_glob> <script_type> [<script_type> ...] [-j <workers>] [-o <output_dir>] [--index] [--store memory|sqlite] [--memory-budget <MB>]
 
 Example:
     python convert.py data.csv web_activity
+    python convert.py batch "cases/*.csv" web_activity application_activity -j 4
 """
 
-import sys
 import csv
 import json
 import os
+import glob
+import heapq
 import importlib.util
+import sys
 import time
+from array import array
+from collections.abc import Iterator
+from itertools import islice
+from operator import itemgetter, le
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from occurrences import OCCURRENCES_EXTENSION, parse_timestamp, format_timestamp, write_occurrence_chunks
+from store import SQLiteStore, DEFAULT_MEMORY_BUDGET_MB
 
 # ==== CONSTANTS ====
 OUTPUT_DIR = "json_machines/"
-SCRIPTS_DIR = "scripts/"
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts")
 DELIMITER = ","
+STORES = ("memory", "sqlite")
+# Occurrences sorted at a time when writing the in-memory index
+OCCURRENCE_SORT_CHUNK = 1 << 18
 
 
 def load_script(script_type):
@@ -58,14 +73,115 @@ def get_available_scripts():
     return scripts
 
 
-def extract_states_and_transitions(input_csv, extract_function):
-    states = []
-    transitions = set()
+def new_occurrence_index():
+    return {
+        # (src, dst, trigger) -> [provisional id, count, first, last]
+        "stats": {},
+        "timestamps": array('q'),
+        "ids": array('I'),
+    }
+
+
+def record_occurrence(index, transition, datetime_str):
+    stats = index["stats"].get(transition)
+    if stats is None:
+        stats = index["stats"][transition] = [
+            len(index["stats"]), 0, None, None]
+
+    stats[1] += 1
+
+    timestamp = parse_timestamp(datetime_str)
+    if timestamp is None:
+        return
+
+    if stats[2] is None or timestamp < stats[2]:
+        stats[2] = timestamp
+    if stats[3] is None or timestamp > stats[3]:
+        stats[3] = timestamp
+
+    index["timestamps"].append(timestamp)
+    index["ids"].append(stats[0])
+
+
+def write_occurrences(index, transitions, output_file):
+    """
+    Write the occurrences sorted by time, with provisional ids remapped to the
+    position of each transition in the sorted transitions list.
+    """
+    stats = index["stats"]
+    position = array('I', bytes(4 * len(stats)))
+    for i, transition in enumerate(transitions):
+        position[stats[transition][0]] = i
+
+    timestamps = index["timestamps"]
+    write_occurrence_chunks(output_file, len(timestamps), sorted_occurrence_chunks(
+        timestamps, index["ids"], position))
+
+
+def sorted_occurrence_chunks(timestamps, ids, position, chunk_size=OCCURRENCE_SORT_CHUNK):
+    """
+    Yield the occurrences as time-sorted (timestamps, positions) chunks
+    without building per-occurrence Python objects for the whole index.
+    Timelines are usually already in time order and are streamed as they are.
+    Otherwise chunks are sorted in place and merged with heapq.merge, so
+    extra memory is bounded by chunk_size rather than the index size.
+    """
+    count = len(timestamps)
+
+    if all(map(le, timestamps, islice(timestamps, 1, None))):
+        for lo in range(0, count, chunk_size):
+            yield (array('q', timestamps[lo:lo + chunk_size]),
+                   array('I', map(position.__getitem__, ids[lo:lo + chunk_size])))
+        return
+
+    # Each chunk is sorted as one packed int per occurrence: the offset from
+    # the smallest timestamp above the chunk-local index. The index keeps
+    # ties in their original order.
+    smallest = min(timestamps)
+    shift = max(1, chunk_size - 1).bit_length()
+    mask = (1 << shift) - 1
+
+    runs = []
+    for lo in range(0, count, chunk_size):
+        hi = min(lo + chunk_size, count)
+        packed = [((timestamps[i] - smallest) << shift) | (i - lo)
+                  for i in range(lo, hi)]
+        packed.sort()
+        chunk_ids = array('I', (ids[lo + (value & mask)] for value in packed))
+        timestamps[lo:hi] = array(
+            'q', ((value >> shift) + smallest for value in packed))
+        ids[lo:hi] = chunk_ids
+        del packed
+        runs.append((lo, hi))
+
+    timestamp_view = memoryview(timestamps)
+    id_view = memoryview(ids)
+    merged = heapq.merge(*(zip(timestamp_view[lo:hi], id_view[lo:hi]) for lo, hi in runs),
+                         key=itemgetter(0))
+
+    while True:
+        chunk_timestamps = array('q')
+        chunk_ids = array('I')
+        for timestamp, transition_id in islice(merged, chunk_size):
+            chunk_timestamps.append(timestamp)
+            chunk_ids.append(position[transition_id])
+
+        if not chunk_timestamps:
+            break
+        yield chunk_timestamps, chunk_ids
+
+
+def iter_transitions(input_csv, extract_function):
+    """
+    Yield (state, transition, row) for every row the extractor recognises.
+    transition is a (src, dst, trigger) tuple, or None when the row does not
+    produce a transition (first state, or a repeated state without loops).
+    """
     previous_state = None
     allow_loop = extract_function.__name__ == "application_activity"
     if allow_loop:
-        states.append("Desktop")
         previous_state = "Desktop"
+        yield previous_state, None, None
 
     with open(input_csv, "r", encoding="utf-8") as file:
         reader = csv.DictReader(file, delimiter=DELIMITER)
@@ -79,61 +195,442 @@ def extract_states_and_transitions(input_csv, extract_function):
             if prev is not None:
                 previous_state = prev
 
-            if state not in states:
-                states.append(state)
-
-            if allow_loop:
-                if previous_state:
-                    transitions.add((previous_state, state, trigger))
+            if previous_state and (allow_loop or previous_state != state):
+                yield state, (previous_state, state, trigger), row
             else:
-                if previous_state and previous_state != state:
-                    transitions.add((previous_state, state, trigger))
+                yield state, None, row
 
             previous_state = state
 
-    return states, sorted(transitions)
+
+def extract_states_and_transitions(input_csv, extract_function, index=None):
+    states = {}
+    transitions = set()
+
+    for state, transition, row in iter_transitions(input_csv, extract_function):
+        states.setdefault(state, None)
+
+        if transition is not None:
+            transitions.add(transition)
+            if index is not None:
+                record_occurrence(index, transition, row.get('datetime'))
+
+    return list(states), sorted(transitions)
+
+
+def extract_to_store(input_csv, extract_function, spill_store, with_index=False):
+    for state, transition, row in iter_transitions(input_csv, extract_function):
+        spill_store.add_state(state)
+
+        if transition is not None:
+            timestamp = parse_timestamp(
+                row.get('datetime')) if with_index else None
+            spill_store.add_transition(transition, timestamp)
+
+
+def write_json(value, json_file, level=0):
+    """
+    Write value like json.dump(value, json_file, indent=4), but also accept
+    iterators in place of lists so large sections can be streamed.
+    """
+    indent = "    "
+
+    if isinstance(value, dict):
+        if not value:
+            json_file.write("{}")
+            return
+
+        json_file.write("{")
+        for i, (key, item) in enumerate(value.items()):
+            json_file.write(("," if i else "") + "\n" +
+                            indent * (level + 1) + json.dumps(key) + ": ")
+            write_json(item, json_file, level + 1)
+        json_file.write("\n" + indent * level + "}")
+
+    elif isinstance(value, (list, tuple, Iterator)):
+        empty = True
+        json_file.write("[")
+        for item in value:
+            json_file.write(("\n" if empty else ",\n") + indent * (level + 1))
+            write_json(item, json_file, level + 1)
+            empty = False
+        json_file.write("]" if empty else "\n" + indent * level + "]")
+
+    else:
+        json_file.write(json.dumps(value))
+
+
+def build_machine(machine_name, input_csv, extract_function, occurrences_file=None):
+    index = new_occurrence_index() if occurrences_file else None
+    states, transitions = extract_states_and_transitions(
+        input_csv, extract_function, index)
+
+    unique_triggers = {trigger for _, _, trigger in transitions}
+
+    transitions_data = [{"trigger": trigger, "source": src, "dest": dst}
+                        for src, dst, trigger in transitions]
+
+    machine_config = {
+        "name": machine_name,
+        "initial_state": states[0] if states else "unknown",
+        "states": states,
+        "triggers": list(unique_triggers),
+        "transitions": transitions_data,
+        "functions": {}
+    }
+
+    if index is not None:
+        for transition, transition_data in zip(transitions, transitions_data):
+            _, count, first, last = index["stats"][transition]
+            add_transition_stats(transition_data, count, first, last)
+
+        write_occurrences(index, transitions, occurrences_file)
+        machine_config["occurrences"] = os.path.basename(occurrences_file)
+
+    return machine_config
+
+
+def build_spilled_machine(machine_name, input_csv, extract_function, spill_store, occurrences_file=None):
+    """
+    Same machine as build_machine, but states, triggers and transitions are
+    iterators over the disk-backed store so they can be streamed to the JSON.
+    """
+    with_index = occurrences_file is not None
+    extract_to_store(input_csv, extract_function, spill_store, with_index)
+
+    def transitions_data():
+        for src, dst, trigger, count, first, last in spill_store.iter_transitions():
+            transition_data = {"trigger": trigger, "source": src, "dest": dst}
+            if with_index:
+                add_transition_stats(transition_data, count, first, last)
+            yield transition_data
+
+    initial_state = spill_store.initial_state()
+
+    machine_config = {
+        "name": machine_name,
+        "initial_state": initial_state if initial_state is not None else "unknown",
+        "states": spill_store.iter_states(),
+        "triggers": spill_store.iter_triggers(),
+        "transitions": transitions_data(),
+        "functions": {}
+    }
+
+    if with_index:
+        write_occurrence_chunks(occurrences_file, spill_store.occurrence_count(),
+                                spill_store.iter_occurrence_chunks())
+        machine_config["occurrences"] = os.path.basename(occurrences_file)
+
+    return machine_config
+
+
+def add_transition_stats(transition_data, count, first, last):
+    transition_data["count"] = count
+    if first is not None:
+        transition_data["first_seen"] = format_timestamp(first)
+        transition_data["last_seen"] = format_timestamp(last)
 
 
-def generate_json(input_csv, output_dir, extract_function, prefix):
+def generate_json(input_csv, output_dir, extract_function, prefix, label=None, with_index=False,
+                  store="memory", memory_budget=DEFAULT_MEMORY_BUDGET_MB):
     current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
 
     output_subdir = os.path.join(output_dir, prefix)
     os.makedirs(output_subdir, exist_ok=True)
 
-    output_json = os.path.join(output_subdir, f"{prefix}_{current_time}.json")
+    machine_name = f"{prefix}_{current_time}"
+    if label:
+        machine_name = f"{label}_{machine_name}"
 
-    states, transitions = extract_states_and_transitions(
-        input_csv, extract_function)
+    output_json = os.path.join(output_subdir, f"{machine_name}.json")
 
-    unique_triggers = {trigger for _, _, trigger in transitions}
+    occurrences_file = None
+    if with_index:
+        occurrences_file = os.path.join(
+            output_subdir, f"{machine_name}{OCCURRENCES_EXTENSION}")
 
-    json_data = {
-        f"{prefix}_machine": [
-            {
-                "name": f"{prefix}_{current_time}",
-                "initial_state": states[0] if states else "unknown",
-                "states": states,
-                "triggers": list(unique_triggers),
-                "transitions": [{"trigger": trigger, "source": src, "dest": dst} for src, dst, trigger in transitions],
-                "functions": {}
-            }
-        ]
+    spill_store = None
+    try:
+        if store == "sqlite":
+            spill_store = SQLiteStore(memory_budget, with_index)
+            machine_config = build_spilled_machine(
+                machine_name, input_csv, extract_function, spill_store, occurrences_file)
+        else:
+            machine_config = build_machine(
+                machine_name, input_csv, extract_function, occurrences_file)
+
+        json_data = {
+            f"{prefix}_machine": [machine_config]
+        }
+
+        with open(output_json, "w", encoding="utf-8") as json_file:
+            write_json(json_data, json_file)
+    finally:
+        if spill_store is not None:
+            spill_store.close()
+
+    return output_json
+
+
+def find_csv_files(pattern):
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.csv")
+
+    return sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+
+
+def batch_labels(csv_files):
+    """
+    Label each input by its file name. Inputs sharing a file name (e.g.
+    img1/timeline.csv and img2/timeline.csv) are labelled by their path
+    relative to the common directory instead, and a numeric suffix is added
+    if labels still clash, so no two jobs write to the same output file.
+    """
+    stems = [os.path.splitext(os.path.basename(csv_file))[0]
+             for csv_file in csv_files]
+    stem_counts = {}
+    for stem in stems:
+        stem_counts[stem] = stem_counts.get(stem, 0) + 1
+
+    common_dir = None
+    if any(count > 1 for count in stem_counts.values()):
+        common_dir = os.path.commonpath(
+            [os.path.dirname(os.path.abspath(csv_file)) for csv_file in csv_files])
+
+    labels = []
+    seen = set()
+    for csv_file, stem in zip(csv_files, stems):
+        label = stem
+        if stem_counts[stem] > 1:
+            relative = os.path.relpath(os.path.splitext(
+                os.path.abspath(csv_file))[0], common_dir)
+            label = relative.replace(os.sep, "_")
+
+        unique_label = label
+        suffix = 2
+        while unique_label in seen:
+            unique_label = f"{label}_{suffix}"
+            suffix += 1
+
+        seen.add(unique_label)
+        labels.append(unique_label)
+
+    return labels
+
+
+def convert_file(csv_file, script_type, output_dir, options, label):
+    """
+    Convert a single CSV with a single extractor. Runs inside a worker process,
+    so the extractor is loaded here rather than passed in.
+    """
+    start_time = time.time()
+
+    extract_function = load_script(script_type)
+    output_json = generate_json(
+        csv_file, output_dir, extract_function, script_type, label, **options)
+
+    return output_json, time.time() - start_time
+
+
+def parse_conversion_options(args):
+    """
+    Pull the options shared by single and batch conversion out of args.
+    Returns the remaining arguments and keyword arguments for generate_json.
+    """
+    options = {
+        "with_index": False,
+        "store": "memory",
+        "memory_budget": DEFAULT_MEMORY_BUDGET_MB
     }
+    remaining = []
+
+    i = 0
+    while i < len(args):
+        if args[i] == '--index':
+            options["with_index"] = True
+            i += 1
+        elif args[i] in ('--store', '--memory-budget'):
+            if i + 1 >= len(args):
+                print(f"Error: {args[i]} requires a value")
+                sys.exit(1)
+
+            if args[i] == '--store':
+                if args[i+1] not in STORES:
+                    print(f"Error: store must be one of: {', '.join(STORES)}")
+                    sys.exit(1)
+                options["store"] = args[i+1]
+            else:
+                try:
+                    options["memory_budget"] = int(args[i+1])
+                except ValueError:
+                    print("Error: memory budget must be an integer (MB)")
+                    sys.exit(1)
+                if options["memory_budget"] < 1:
+                    print("Error: memory budget must be at least 1 MB")
+                    sys.exit(1)
+            i += 2
+        else:
+            remaining.append(args[i])
+            i += 1
+
+    return remaining, options
+
+
+def run_pool(jobs, workers, output_dir, options, interrupted):
+    """
+    Run jobs in one process pool and yield (job, output_json, duration, error)
+    as they finish. Jobs lost to a broken pool are appended to interrupted
+    instead of being reported.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(convert_file, csv_file, script_type, output_dir, options, label): (csv_file, script_type, label)
+            for csv_file, script_type, label in jobs
+        }
+
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                output_json, duration = future.result()
+            except BrokenProcessPool:
+                interrupted.append(job)
+                continue
+            except Exception as e:
+                yield job, None, None, e
+                continue
+
+            yield job, output_json, duration, None
+
+
+def run_jobs(jobs, workers, output_dir, options):
+    """
+    Run (csv_file, script_type, label) jobs in a process pool and yield
+    (job, output_json, duration, error) as they finish.
+
+    A worker that dies (e.g. killed by the OOM killer) breaks the whole pool
+    and fails every unfinished job with BrokenProcessPool without telling
+    which job caused it. Those jobs are resubmitted once to a fresh pool of
+    the same size. Only if that pool breaks as well are the remaining jobs
+    rerun one at a time, so just the job that kills its worker fails.
+    """
+    interrupted = []
+    yield from run_pool(jobs, workers, output_dir, options, interrupted)
+
+    if not interrupted:
+        return
+
+    print(f"A worker process terminated abruptly, resubmitting "
+          f"{len(interrupted)} interrupted conversion(s)")
+    jobs, interrupted = interrupted, []
+    yield from run_pool(jobs, workers, output_dir, options, interrupted)
+
+    if interrupted:
+        print(f"A worker process terminated abruptly again, rerunning "
+              f"{len(interrupted)} interrupted conversion(s) one at a time")
+
+    for job in interrupted:
+        broken = []
+        yield from run_pool([job], 1, output_dir, options, broken)
+        if broken:
+            yield job, None, None, RuntimeError(
+                "worker process terminated abruptly (killed or out of memory)")
+
+
+def batch_main(args):
+    args, options = parse_conversion_options(args)
+
+    if len(args) < 2:
+        print("Error: batch requires <csv_dir_or_glob> <script_type> [<script_type> ...]")
+        sys.exit(1)
+
+    workers = os.cpu_count() or 1
+    output_dir = OUTPUT_DIR
+    positional = []
+
+    i = 0
+    while i < len(args):
+        if args[i] in ('-j', '-o'):
+            if i + 1 >= len(args):
+                print(f"Error: {args[i]} requires a value")
+                sys.exit(1)
+
+            if args[i] == '-j':
+                try:
+                    workers = int(args[i+1])
+                except ValueError:
+                    print("Error: workers must be an integer")
+                    sys.exit(1)
+                if workers < 1:
+                    print("Error: workers must be at least 1")
+                    sys.exit(1)
+            else:
+                output_dir = args[i+1]
+            i += 2
+        else:
+            positional.append(args[i])
+            i += 1
+
+    if len(positional) < 2:
+        print("Error: batch requires <csv_dir_or_glob> <script_type> [<script_type> ...]")
+        sys.exit(1)
+
+    csv_files = find_csv_files(positional[0])
+    script_types = positional[1:]
+    available_scripts = get_available_scripts()
+
+    if not csv_files:
+        print(f"Error: No CSV files match '{positional[0]}'")
+        sys.exit(1)
+
+    for script_type in script_types:
+        if script_type not in available_scripts:
+            print(f"Error: Unknown script type '{script_type}'")
+            sys.exit(1)
 
-    with open(output_json, "w", encoding="utf-8") as json_file:
-        json.dump(json_data, json_file, indent=4)
+    start_time = time.time()
+    failures = 0
+    total_jobs = len(csv_files) * len(script_types)
 
-    print(f"Conversion complete")
+    print(f"Converting {len(csv_files)} file(s) with {len(script_types)} "
+          f"extractor(s) using {workers} worker(s)")
+
+    jobs = [(csv_file, script_type, label)
+            for csv_file, label in zip(csv_files, batch_labels(csv_files))
+            for script_type in script_types]
+
+    for (csv_file, script_type, _), output_json, duration, error in run_jobs(jobs, workers, output_dir, options):
+        if error is not None:
+            failures += 1
+            print(f"[FAILED] {csv_file} ({script_type}): {str(error)}")
+            continue
+
+        size_mb = os.path.getsize(csv_file) / (1024 * 1024)
+        throughput = size_mb / duration if duration > 0 else 0.0
+        print(f"[OK] {csv_file} ({script_type}) -> {output_json} "
+              f"in {duration:.2f}s ({throughput:.2f} MB/s)")
+
+    duration = time.time() - start_time
+    print(f"Batch completed in {duration:.2f} seconds: "
+          f"{total_jobs - failures}/{total_jobs} conversion(s) succeeded.")
+
+    if failures:
+        sys.exit(1)
 
 
 def main():
-    if len(sys.argv) != 3:
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        batch_main(sys.argv[2:])
+        return
+
+    args, options = parse_conversion_options(sys.argv[1:])
+
+    if len(args) != 2:
         print("Error: Incorrect number of arguments")
         print()
         sys.exit(1)
 
-    csv_file = sys.argv[1]
-    script_type = sys.argv[2]
+    csv_file = args[0]
+    script_type = args[1]
     available_scripts = get_available_scripts()
 
     if not os.path.exists(csv_file):
@@ -148,7 +645,9 @@ def main():
         start_time = time.time()  # Start timer
 
         extract_function = load_script(script_type)
-        generate_json(csv_file, OUTPUT_DIR, extract_function, script_type)
+        generate_json(csv_file, OUTPUT_DIR, extract_function,
+                      script_type, **options)
+        print(f"Conversion complete")
 
         end_time = time.time()  # End timer
         duration = end_time - start_time
@@ -0,0 +1,104 @@
+"""
+Occurrence Index Format
+
+The single definition of the occurrence index written by the converter with
+--index and read by fsm/timeindex.py.
+
+Layout: magic, little-endian uint64 count, then <count> int64 timestamps
+(microseconds since epoch, sorted) followed by <count> uint32 positions into
+the machine's "transitions" list.
+"""
+
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from datetime import datetime, timedelta, timezone
+
+OCCURRENCES_MAGIC = b"RFSMOCC1"
+OCCURRENCES_EXTENSION = ".occ"
+HEADER_SIZE = len(OCCURRENCES_MAGIC) + 8
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def parse_timestamp(datetime_str):
+    """
+    Convert a Plaso datetime string into microseconds since epoch, or None.
+    """
+    if not datetime_str:
+        return None
+
+    try:
+        value = datetime.fromisoformat(datetime_str.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+
+    return (value - EPOCH) // MICROSECOND
+
+
+def format_timestamp(timestamp):
+    return (EPOCH + timedelta(microseconds=timestamp)).isoformat()
+
+
+def write_occurrence_chunks(output_file, count, chunks):
+    """
+    Write <count> occurrences given as sorted (timestamps, positions) array
+    chunks. Positions are staged in a temporary file because the format stores
+    all timestamps before all positions.
+    """
+    with open(output_file, "wb") as occ_file, tempfile.TemporaryFile() as ids_file:
+        occ_file.write(OCCURRENCES_MAGIC)
+        occ_file.write(struct.pack('<Q', count))
+
+        for timestamps, ids in chunks:
+            if sys.byteorder != 'little':
+                timestamps.byteswap()
+                ids.byteswap()
+            timestamps.tofile(occ_file)
+            ids.tofile(ids_file)
+
+        ids_file.seek(0)
+        shutil.copyfileobj(ids_file, occ_file)
+
+
+def load_occurrences(occurrences_file):
+    """
+    Return (timestamps, ids) sequences for an occurrence index file. On little
+    endian hosts the file is memory mapped, so only the pages touched by a
+    binary search and the selected window are read from disk.
+    """
+    with open(occurrences_file, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+        if len(header) != HEADER_SIZE or not header.startswith(OCCURRENCES_MAGIC):
+            raise ValueError(
+                f"'{occurrences_file}' is not an occurrence index file")
+
+        (count,) = struct.unpack('<Q', header[len(OCCURRENCES_MAGIC):])
+        if os.fstat(f.fileno()).st_size != HEADER_SIZE + 12 * count:
+            raise ValueError(
+                f"'{occurrences_file}' is truncated or corrupt, its size does not "
+                f"match the {count} occurrence(s) in its header")
+
+        if count == 0:
+            return array('q'), array('I')
+
+        if sys.byteorder == 'little':
+            data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            timestamps = data[HEADER_SIZE:HEADER_SIZE + 8 * count].cast('q')
+            ids = data[HEADER_SIZE + 8 * count:HEADER_SIZE + 12 * count].cast('I')
+            return timestamps, ids
+
+        timestamps = array('q')
+        ids = array('I')
+        timestamps.fromfile(f, count)
+        ids.fromfile(f, count)
+        timestamps.byteswap()
+        ids.byteswap()
+        return timestamps, ids
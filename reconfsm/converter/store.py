@@ -0,0 +1,203 @@
+"""
+Disk-backed State/Transition Store
+
+Holds the state index, the transition set and (optionally) the occurrence
+index of a conversion in a temporary SQLite database instead of in memory.
+Updates are buffered in memory and flushed in batches, and SQLite sorts the
+results on disk, so memory use is bounded by the configured budget rather
+than by the number of unique states and transitions in the timeline.
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+from array import array
+
+DEFAULT_MEMORY_BUDGET_MB = 256
+
+# Rough in-memory cost of one buffered state, transition or occurrence
+BUFFER_ENTRY_BYTES = 256
+FETCH_SIZE = 65536
+
+
+class SQLiteStore:
+    def __init__(self, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, with_index=False, spill_dir=None):
+        budget_bytes = max(1, memory_budget_mb) * 1024 * 1024
+
+        # Half of the budget goes to the SQLite page cache, the other half to
+        # the write buffers below.
+        self.buffer_limit = max(1024, budget_bytes // 2 // BUFFER_ENTRY_BYTES)
+        self.with_index = with_index
+
+        self.directory = tempfile.mkdtemp(prefix="reconfsm_", dir=spill_dir)
+        self.connection = sqlite3.connect(
+            os.path.join(self.directory, "store.db"))
+
+        self.connection.execute("PRAGMA journal_mode = OFF")
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.connection.execute("PRAGMA temp_store = FILE")
+        self.connection.execute(
+            f"PRAGMA cache_size = -{max(1024, budget_bytes // 2 // 1024)}")
+
+        self.connection.executescript("""
+            CREATE TABLE states (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE transitions (
+                id INTEGER PRIMARY KEY,
+                src TEXT NOT NULL,
+                dst TEXT NOT NULL,
+                trigger TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                first INTEGER,
+                last INTEGER,
+                UNIQUE (src, dst, trigger)
+            );
+            CREATE TABLE occurrences (
+                timestamp INTEGER NOT NULL,
+                transition_id INTEGER NOT NULL
+            );
+        """)
+
+        self.pending_states = {}
+        # (src, dst, trigger) -> [count, first, last]
+        self.pending_transitions = {}
+        # (timestamp, (src, dst, trigger))
+        self.pending_occurrences = []
+
+    def add_state(self, state):
+        self.pending_states[state] = None
+        if len(self.pending_states) >= self.buffer_limit:
+            self.flush()
+
+    def add_transition(self, transition, timestamp=None):
+        stats = self.pending_transitions.get(transition)
+        if stats is None:
+            stats = self.pending_transitions[transition] = [0, None, None]
+
+        stats[0] += 1
+
+        if timestamp is not None:
+            if stats[1] is None or timestamp < stats[1]:
+                stats[1] = timestamp
+            if stats[2] is None or timestamp > stats[2]:
+                stats[2] = timestamp
+
+            if self.with_index:
+                self.pending_occurrences.append((timestamp, transition))
+
+        if len(self.pending_transitions) + len(self.pending_occurrences) >= self.buffer_limit:
+            self.flush()
+
+    def flush(self):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO states (name) VALUES (?)",
+                ((state,) for state in self.pending_states))
+
+            self.connection.executemany(
+                """
+                INSERT INTO transitions (src, dst, trigger, count, first, last)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (src, dst, trigger) DO UPDATE SET
+                    count = count + excluded.count,
+                    first = min(coalesce(first, excluded.first), coalesce(excluded.first, first)),
+                    last = max(coalesce(last, excluded.last), coalesce(excluded.last, last))
+                """,
+                ((src, dst, trigger, count, first, last)
+                 for (src, dst, trigger), (count, first, last) in self.pending_transitions.items()))
+
+            if self.pending_occurrences:
+                ids = {}
+                for transition in self.pending_transitions:
+                    ids[transition] = self.connection.execute(
+                        "SELECT id FROM transitions WHERE src = ? AND dst = ? AND trigger = ?",
+                        transition).fetchone()[0]
+
+                self.connection.executemany(
+                    "INSERT INTO occurrences (timestamp, transition_id) VALUES (?, ?)",
+                    ((timestamp, ids[transition])
+                     for timestamp, transition in self.pending_occurrences))
+
+        self.pending_states.clear()
+        self.pending_transitions.clear()
+        self.pending_occurrences.clear()
+
+    def _query(self, sql, parameters=()):
+        cursor = self.connection.execute(sql, parameters)
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            yield from rows
+
+    def initial_state(self):
+        self.flush()
+        row = self.connection.execute(
+            "SELECT name FROM states ORDER BY id LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def iter_states(self):
+        """
+        States in the order they were first seen.
+        """
+        self.flush()
+        for (name,) in self._query("SELECT name FROM states ORDER BY id"):
+            yield name
+
+    def iter_triggers(self):
+        self.flush()
+        for (trigger,) in self._query("SELECT DISTINCT trigger FROM transitions ORDER BY trigger"):
+            yield trigger
+
+    def iter_transitions(self):
+        """
+        (src, dst, trigger, count, first, last) sorted like sorted() sorts the
+        in-memory tuples. SQLite's BINARY collation compares UTF-8 bytes, which
+        gives the same order as Python's code point comparison.
+        """
+        self.flush()
+        yield from self._query(
+            "SELECT src, dst, trigger, count, first, last FROM transitions ORDER BY src, dst, trigger")
+
+    def occurrence_count(self):
+        self.flush()
+        return self.connection.execute("SELECT COUNT(*) FROM occurrences").fetchone()[0]
+
+    def iter_occurrence_chunks(self):
+        """
+        Occurrences sorted by time (ties in insertion order) as chunks of
+        (timestamps, positions) arrays, where positions index the transitions
+        in iter_transitions() order.
+        """
+        self.flush()
+        with self.connection:
+            self.connection.executescript("""
+                DROP TABLE IF EXISTS positions;
+                CREATE TABLE positions (
+                    transition_id INTEGER PRIMARY KEY,
+                    position INTEGER NOT NULL
+                );
+                INSERT INTO positions (transition_id, position)
+                SELECT id, ROW_NUMBER() OVER (ORDER BY src, dst, trigger) - 1
+                FROM transitions;
+            """)
+
+        cursor = self.connection.execute("""
+            SELECT o.timestamp, p.position
+            FROM occurrences AS o
+            JOIN positions AS p ON p.transition_id = o.transition_id
+            ORDER BY o.timestamp, o.rowid
+        """)
+
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            yield array('q', (row[0] for row in rows)), array('I', (row[1] for row in rows))
+
+    def close(self):
+        self.connection.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
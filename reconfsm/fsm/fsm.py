@@ -6,6 +6,9 @@ FSM Simulator Program
 Usage:
     python fsm_simulator.py <json_file> graph
     python fsm_simulator.py <json_file> pathfinding -s <state_name> -d <depth>
+    python fsm_simulator.py <json_file> window -f <start_time> -t <end_time> [graph | pathfinding ...]
+    python fsm_simulator.py <json_file> replay -l <trigger_file> [-m <max_candidates>]
+    python fsm_simulator.py <json_file> replay -c <csv_file> -x <script_type>
 """
 
 import sys
@@ -14,14 +17,17 @@ import os
 from transitions.extensions import GraphMachine
 from pathfinding import pathfinding_simulation
 from graph import graph_simulation
+from timeindex import window_simulation
+from replay import replay_simulation, replay_csv_simulation, read_trigger_sequences, MAX_CANDIDATES
 
 
 class FSMachine:
-    def __init__(self, name, states, transitions, functions, initial_state):
+    def __init__(self, name, states, transitions, functions, initial_state, occurrences=None):
         self.name = name
         self.states = states
         self.initial_state = initial_state
         self.transitions_data = transitions
+        self.occurrences = occurrences
         self.machine = GraphMachine(
             model=self,
             states=states,
@@ -52,7 +58,11 @@ def load_machine_from_json(json_file):
     transitions = machine_config.get("transitions")
     functions = machine_config.get("functions", {})
 
-    return FSMachine(name, states, transitions, functions, initial_state)
+    occurrences = machine_config.get("occurrences")
+    if occurrences:
+        occurrences = os.path.join(os.path.dirname(json_file), occurrences)
+
+    return FSMachine(name, states, transitions, functions, initial_state, occurrences)
 
 
 def main():
@@ -98,9 +108,63 @@ def main():
             pathfinding_simulation(machine, state_name, depth)
             i += 5
 
+        elif sim_type == 'window':
+            if i + 4 >= len(simulations) or simulations[i+1] != '-f' or simulations[i+3] != '-t':
+                print("Error: window requires -f <start_time> -t <end_time>")
+                sys.exit(1)
+
+            try:
+                machine = window_simulation(
+                    machine, simulations[i+2], simulations[i+4])
+            except ValueError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+            i += 5
+
+        elif sim_type == 'replay':
+            if i + 2 < len(simulations) and simulations[i+1] == '-l':
+                trigger_file = simulations[i+2]
+                if not os.path.exists(trigger_file):
+                    print(f"Error: Trigger file '{trigger_file}' not found")
+                    sys.exit(1)
+
+                i += 3
+
+                max_candidates = MAX_CANDIDATES
+                if i + 1 < len(simulations) and simulations[i] == '-m':
+                    try:
+                        max_candidates = int(simulations[i+1])
+                    except ValueError:
+                        print("Error: max candidates must be an integer")
+                        sys.exit(1)
+                    if max_candidates < 1:
+                        print("Error: max candidates must be at least 1")
+                        sys.exit(1)
+                    i += 2
+
+                replay_simulation(machine, read_trigger_sequences(
+                    trigger_file), max_candidates)
+
+            elif i + 4 < len(simulations) and simulations[i+1] == '-c' and simulations[i+3] == '-x':
+                csv_file = simulations[i+2]
+                if not os.path.exists(csv_file):
+                    print(f"Error: CSV file '{csv_file}' not found")
+                    sys.exit(1)
+
+                try:
+                    replay_csv_simulation(machine, csv_file, simulations[i+4])
+                except ValueError as e:
+                    print(f"Error: {e}")
+                    sys.exit(1)
+                i += 5
+
+            else:
+                print("Error: replay requires -l <trigger_file> or -c <csv_file> -x <script_type>")
+                sys.exit(1)
+
         else:
             print(f"Error: Unknown simulation type '{sim_type}'")
-            print("Available types: graph, pathfinding")
+            print("Available types: graph, pathfinding, window, replay")
             sys.exit(1)
 
 
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+"""
+FSM Merge Program
+
+Merges any number of machine JSON files (e.g. the same activity type from
+several disk images or users) into a single machine holding the union of
+their states and transitions. Every transition is tagged with the names of
+the machines it was observed in.
+
+Usage:
+    python merge.py <json_file> [<json_file> ...] [-o <output_json>]
+
+Example:
+    python merge.py disk01_web.json disk02_web.json -o merged_web.json
+"""
+
+import sys
+import json
+import os
+import time
+from datetime import datetime
+from replay import load_converter
+
+
+def read_machine_config(json_file):
+    with open(json_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    for category, machines in data.items():
+        if isinstance(machines, list) and len(machines) > 0:
+            return machines[0]
+
+    raise ValueError(f"No machine definition found in '{json_file}'")
+
+
+def merge_machines(json_files):
+    """
+    Read the machines one file at a time. Only the deduplicated states,
+    triggers and transitions are kept between files, so memory grows with the
+    number of unique entries plus the largest single input, not with the
+    number of inputs.
+
+    Counts and first/last timestamps from indexed machines are aggregated.
+    When a transition was also seen in an input without counts its stats are
+    incomplete, and it maps to None in the returned stats.
+    """
+    states = {}
+    triggers = {}
+    transitions = {}
+    stats = {}
+    unindexed = set()
+    initial_state = None
+
+    for json_file in json_files:
+        machine_config = read_machine_config(json_file)
+        machine_name = machine_config.get(
+            "name") or os.path.splitext(os.path.basename(json_file))[0]
+
+        if initial_state is None:
+            initial_state = machine_config.get("initial_state")
+
+        for state in machine_config.get("states", []):
+            states.setdefault(state, state)
+
+        for trigger in machine_config.get("triggers", []):
+            triggers.setdefault(trigger, trigger)
+
+        for transition in machine_config.get("transitions", []):
+            # Map to the first seen copy of each string so keys from later
+            # files do not keep their own duplicates alive.
+            src = states.setdefault(transition["source"], transition["source"])
+            dst = states.setdefault(transition["dest"], transition["dest"])
+            trigger = triggers.setdefault(
+                transition["trigger"], transition["trigger"])
+            key = (src, dst, trigger)
+
+            origins = transitions.get(key)
+            if origins is None:
+                origins = transitions[key] = {}
+
+            # Already merged inputs carry their own origins, keep them.
+            for origin in transition.get("origins", [machine_name]):
+                origins.setdefault(origin, None)
+
+            if "count" in transition:
+                _merge_stats(stats, key, transition)
+            else:
+                unindexed.add(key)
+
+        del machine_config
+
+    for key in unindexed:
+        if key in stats:
+            stats[key] = None
+
+    return initial_state, list(states), list(triggers), transitions, stats
+
+
+def _merge_stats(stats, key, transition):
+    first = transition.get("first_seen")
+    last = transition.get("last_seen")
+
+    current = stats.get(key)
+    if current is None:
+        stats[key] = [transition["count"], first, last]
+        return
+
+    current[0] += transition["count"]
+    if first is not None and (current[1] is None or first < current[1]):
+        current[1] = first
+    if last is not None and (current[2] is None or last > current[2]):
+        current[2] = last
+
+
+def _transition_data(src, dst, trigger, origins, stats):
+    transition = {"trigger": trigger, "source": src,
+                  "dest": dst, "origins": list(origins)}
+
+    if stats is not None:
+        count, first, last = stats
+        transition["count"] = count
+        if first is not None:
+            transition["first_seen"] = first
+        if last is not None:
+            transition["last_seen"] = last
+
+    return transition
+
+
+def generate_merged_json(json_files, output_json=None):
+    current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
+    name = f"merged_{current_time}"
+
+    if output_json is None:
+        output_json = os.path.join('result', name, f"{name}.json")
+
+    output_subdir = os.path.dirname(output_json)
+    if output_subdir:
+        os.makedirs(output_subdir, exist_ok=True)
+
+    initial_state, states, triggers, transitions, stats = merge_machines(
+        json_files)
+
+    json_data = {
+        "merged_machine": [
+            {
+                "name": name,
+                "initial_state": initial_state if initial_state else (states[0] if states else "unknown"),
+                "states": states,
+                "triggers": triggers,
+                "transitions": (_transition_data(src, dst, trigger, transitions[(src, dst, trigger)], stats.get((src, dst, trigger)))
+                                for src, dst, trigger in sorted(transitions)),
+                "functions": {}
+            }
+        ]
+    }
+
+    # Stream the transitions instead of building the whole list of dicts
+    write_json = load_converter().write_json
+    with open(output_json, "w", encoding="utf-8") as json_file:
+        write_json(json_data, json_file)
+
+    print(f"Merged {len(json_files)} machine(s): {len(states)} state(s), "
+          f"{len(transitions)} transition(s)")
+
+    partial = sum(1 for value in stats.values() if value is None)
+    if partial:
+        print(f"Warning: {partial} transition(s) also appear in machines without "
+              f"counts, their count and first/last timestamps are left out")
+    print(f"Merged machine saved to: {output_json}")
+
+    return output_json
+
+
+def main():
+    args = sys.argv[1:]
+    output_json = None
+    json_files = []
+
+    i = 0
+    while i < len(args):
+        if args[i] == '-o':
+            if i + 1 >= len(args):
+                print("Error: -o requires <output_json>")
+                sys.exit(1)
+            output_json = args[i+1]
+            i += 2
+        else:
+            json_files.append(args[i])
+            i += 1
+
+    if not json_files:
+        print("Usage: python merge.py <json_file> [<json_file> ...] [-o <output_json>]")
+        sys.exit(1)
+
+    for json_file in json_files:
+        if not os.path.exists(json_file):
+            print(f"Error: JSON file '{json_file}' not found")
+            sys.exit(1)
+
+    try:
+        start_time = time.time()
+
+        generate_merged_json(json_files, output_json)
+
+        duration = time.time() - start_time
+        print(f"Program completed in {duration:.2f} seconds.")
+
+    except Exception as e:
+        print(f"Error during merge: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
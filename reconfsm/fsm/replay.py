@@ -0,0 +1,321 @@
+import os
+import sys
+import time
+import importlib.util
+
+CONVERTER_FILE = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '..', 'converter', 'converter.py')
+# Largest set of possible current states followed for an ambiguous trigger list
+MAX_CANDIDATES = 64
+
+
+def build_lookup(machine):
+    """
+    Precompute state -> {trigger: dest} for the machine's transitions. When
+    the same trigger leads from one state to several destinations the entry is
+    a frozenset of all of them.
+    """
+    table = {state: {} for state in machine.states}
+
+    for transition in machine.transitions_data:
+        trigger = transition['trigger']
+        dest = transition['dest']
+
+        if transition['source'] == '*':
+            sources = [state for state in machine.states if state != dest]
+        else:
+            sources = [transition['source']]
+
+        for source in sources:
+            row = table.setdefault(source, {})
+            existing = row.get(trigger)
+            if existing is None:
+                row[trigger] = dest
+            elif existing.__class__ is str:
+                if existing != dest:
+                    row[trigger] = frozenset((existing, dest))
+            else:
+                row[trigger] = existing | {dest}
+
+    return table
+
+
+def count_lookup_transitions(table):
+    total = 0
+    for row in table.values():
+        for dest in row.values():
+            total += 1 if dest.__class__ is str else len(dest)
+    return total
+
+
+def replay_triggers(table, initial_state, triggers, max_candidates=MAX_CANDIDATES):
+    """
+    Run a trigger sequence from initial_state and stop at the first trigger
+    the current state cannot take.
+
+    When a trigger leads to several states, all of them are followed as a set
+    of candidates until the sequence narrows them down again. A transition
+    only counts as covered when it is the single transition that survives a
+    step; the other steps are counted as ambiguous. If more than
+    max_candidates states become possible the replay stops as undetermined.
+    """
+    empty = {}
+    used = set()
+    visited = {initial_state}
+    state = initial_state
+    accepted = 0
+    ambiguous = 0
+    peak_candidates = 1
+    deviation = None
+    undetermined = None
+
+    for trigger in triggers:
+        if state.__class__ is str:
+            dest = table.get(state, empty).get(trigger)
+            if dest is None:
+                deviation = {"index": accepted,
+                             "state": state, "trigger": trigger}
+                break
+            if dest.__class__ is str:
+                used.add((state, trigger, dest))
+                state = dest
+                accepted += 1
+                continue
+
+            # One known source, several destinations
+            candidates = dest
+            ambiguous += 1
+        else:
+            candidates = set()
+            survivors = 0
+            survivor = None
+            for source in state:
+                dest = table.get(source, empty).get(trigger)
+                if dest is None:
+                    continue
+                if dest.__class__ is str:
+                    survivors += 1
+                    survivor = (source, trigger, dest)
+                    candidates.add(dest)
+                else:
+                    survivors += len(dest)
+                    candidates |= dest
+                if len(candidates) > max_candidates:
+                    break
+
+            if not candidates:
+                deviation = {"index": accepted, "state": " | ".join(
+                    sorted(state)), "trigger": trigger}
+                break
+
+            if survivors == 1:
+                used.add(survivor)
+            else:
+                ambiguous += 1
+
+        if len(candidates) > max_candidates:
+            undetermined = {"index": accepted, "trigger": trigger,
+                            "candidates": len(candidates), "limit": max_candidates}
+            break
+
+        if len(candidates) == 1:
+            (state,) = candidates
+            visited.add(state)
+        else:
+            peak_candidates = max(peak_candidates, len(candidates))
+            state = frozenset(candidates)
+        accepted += 1
+
+    for src, _, dst in used:
+        visited.add(src)
+        visited.add(dst)
+
+    return {
+        "events": accepted + 1 if deviation or undetermined else accepted,
+        "accepted": accepted,
+        "invalid": 1 if deviation else 0,
+        "deviation": deviation,
+        "undetermined": undetermined,
+        "ambiguous": ambiguous,
+        "peak_candidates": peak_candidates,
+        "used": used,
+        "visited": visited
+    }
+
+
+def replay_transitions(table, transitions):
+    """
+    Check observed (src, dst, trigger) transitions against the lookup table.
+    Each transition carries its own source, so checking continues past
+    invalid transitions and all of them are counted.
+    """
+    empty = {}
+    used = set()
+    visited = set()
+    events = 0
+    invalid = 0
+    accepted = None
+    deviation = None
+
+    for src, dst, trigger in transitions:
+        dest = table.get(src, empty).get(trigger)
+        if dest is not None and (dest == dst if dest.__class__ is str else dst in dest):
+            used.add((src, trigger, dst))
+        else:
+            if deviation is None:
+                accepted = events
+                deviation = {"index": events, "state": src,
+                             "trigger": trigger, "observed_dest": dst}
+            invalid += 1
+        events += 1
+
+    for src, _, dst in used:
+        visited.add(src)
+        visited.add(dst)
+
+    return {
+        "events": events,
+        "accepted": events if accepted is None else accepted,
+        "invalid": invalid,
+        "deviation": deviation,
+        "undetermined": None,
+        "ambiguous": 0,
+        "peak_candidates": 1,
+        "used": used,
+        "visited": visited
+    }
+
+
+def load_converter():
+    # converter.py imports its sibling modules (e.g. store.py) by name
+    converter_dir = os.path.dirname(os.path.abspath(CONVERTER_FILE))
+    if converter_dir not in sys.path:
+        sys.path.insert(0, converter_dir)
+
+    spec = importlib.util.spec_from_file_location('converter', CONVERTER_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def iter_csv_transitions(csv_file, script_type):
+    """
+    Load the converter script up front and return a generator of the
+    (src, dst, trigger) transitions the converter would record for the CSV.
+    """
+    converter = load_converter()
+    if script_type not in converter.get_available_scripts():
+        raise ValueError(f"Unknown script type '{script_type}'")
+
+    extract_function = converter.load_script(script_type)
+
+    return (transition
+            for _, transition, _ in converter.iter_transitions(csv_file, extract_function)
+            if transition is not None)
+
+
+def _read_sequence(first_trigger, triggers):
+    yield first_trigger
+    for trigger in triggers:
+        if not trigger:
+            return
+        yield trigger
+
+
+def read_trigger_sequences(trigger_file):
+    """
+    One trigger per line, sequences separated by blank lines. Sequences are
+    yielded as lazy iterators over the file, so only the current line is held
+    in memory. Triggers a consumer leaves unread are skipped before the next
+    sequence starts.
+    """
+    with open(trigger_file, 'r', encoding='utf-8') as f:
+        triggers = (line.strip() for line in f)
+        for trigger in triggers:
+            if not trigger:
+                continue
+
+            sequence = _read_sequence(trigger, triggers)
+            yield sequence
+            for _ in sequence:
+                pass
+
+
+def display_replay_result(label, result, total_states, total_transitions, duration):
+    print(f"\n{label}:")
+
+    rate = result["events"] / duration if duration > 0 else 0.0
+    print(f"  Events replayed: {result['events']} "
+          f"in {duration:.3f}s ({rate:,.0f} events/s)")
+    print(f"  Accepted prefix: {result['accepted']} event(s)")
+
+    deviation = result["deviation"]
+    undetermined = result["undetermined"]
+    if deviation is not None:
+        dest = deviation.get("observed_dest")
+        if dest is not None:
+            print(f"  First invalid transition at event {deviation['index']}: "
+                  f"{deviation['state']} --[{deviation['trigger']}]--> {dest}")
+        else:
+            print(f"  First invalid transition at event {deviation['index']}: "
+                  f"'{deviation['trigger']}' from {deviation['state']}")
+        print(f"  Invalid transitions: {result['invalid']}")
+    elif undetermined is not None:
+        print(f"  Stopped at event {undetermined['index']}: "
+              f"'{undetermined['trigger']}' leaves more than {undetermined['limit']} possible states, "
+              f"the sequence is too ambiguous to follow")
+    else:
+        print("  Conforms to the machine")
+
+    if result["ambiguous"]:
+        print(f"  Ambiguous steps: {result['ambiguous']} "
+              f"(up to {result['peak_candidates']} possible states), not counted as covered")
+
+    state_coverage = len(result["visited"]) / total_states if total_states else 0.0
+    transition_coverage = len(
+        result["used"]) / total_transitions if total_transitions else 0.0
+    print(f"  State coverage: {len(result['visited'])}/{total_states} "
+          f"({state_coverage:.1%})")
+    print(f"  Transition coverage: {len(result['used'])}/{total_transitions} "
+          f"({transition_coverage:.1%})")
+
+
+def replay_simulation(machine, trigger_sequences, max_candidates=MAX_CANDIDATES):
+    """
+    Replay plain trigger sequences (iterables of trigger names) from the
+    machine's initial state.
+    """
+    table = build_lookup(machine)
+    total_states = len(table)
+    total_transitions = count_lookup_transitions(table)
+
+    results = []
+    for i, triggers in enumerate(trigger_sequences, 1):
+        start_time = time.perf_counter()
+        result = replay_triggers(
+            table, machine.initial_state, triggers, max_candidates)
+        duration = time.perf_counter() - start_time
+
+        display_replay_result(f"Sequence {i}", result,
+                              total_states, total_transitions, duration)
+        results.append(result)
+
+    return results
+
+
+def replay_csv_simulation(machine, csv_file, script_type):
+    """
+    Extract the transitions of a timeline CSV with a converter script and
+    check them against the machine.
+    """
+    table = build_lookup(machine)
+    transitions = iter_csv_transitions(csv_file, script_type)
+
+    start_time = time.perf_counter()
+    result = replay_transitions(table, transitions)
+    duration = time.perf_counter() - start_time
+
+    display_replay_result(f"{csv_file} ({script_type})", result,
+                          len(table), count_lookup_transitions(table), duration)
+
+    return result
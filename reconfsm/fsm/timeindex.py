@@ -0,0 +1,122 @@
+import os
+import importlib.util
+from bisect import bisect_left
+
+OCCURRENCES_FILE = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '..', 'converter', 'occurrences.py')
+
+
+def load_occurrence_format():
+    """
+    Load the occurrence index format shared with the converter, so the file
+    layout and timestamp conversion have a single definition.
+    """
+    spec = importlib.util.spec_from_file_location(
+        'occurrences', OCCURRENCES_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+occurrence_format = load_occurrence_format()
+
+
+def parse_time(value):
+    timestamp = occurrence_format.parse_timestamp(value)
+    if timestamp is None:
+        raise ValueError(f"Invalid time '{value}', expected an ISO 8601 timestamp")
+    return timestamp
+
+
+def slice_transitions(machine, start, end):
+    """
+    Collect the transitions that occurred in [start, end), with their counts
+    and first/last timestamps recomputed for the window.
+    """
+    timestamps, ids = occurrence_format.load_occurrences(machine.occurrences)
+
+    lo = bisect_left(timestamps, start)
+    hi = bisect_left(timestamps, end, lo)
+
+    total = len(machine.transitions_data)
+    window = {}
+    for timestamp, transition_id in zip(timestamps[lo:hi], ids[lo:hi]):
+        stats = window.get(transition_id)
+        if stats is None:
+            if transition_id >= total:
+                raise ValueError(
+                    f"Occurrence index '{machine.occurrences}' does not belong to "
+                    f"machine '{machine.name}', convert it again with --index")
+            window[transition_id] = [1, timestamp, timestamp]
+        else:
+            stats[0] += 1
+            stats[2] = timestamp
+
+    initial_state = None
+    if lo < hi:
+        initial_state = machine.transitions_data[ids[lo]]['source']
+
+    transitions = []
+    for transition_id in sorted(window):
+        count, first, last = window[transition_id]
+        transition = machine.transitions_data[transition_id]
+        transitions.append({
+            "trigger": transition["trigger"],
+            "source": transition["source"],
+            "dest": transition["dest"],
+            "count": count,
+            "first_seen": occurrence_format.format_timestamp(first),
+            "last_seen": occurrence_format.format_timestamp(last)
+        })
+
+    return initial_state, transitions
+
+
+def window_simulation(machine, start_time, end_time):
+    """
+    Return a new machine of the same type restricted to the transitions that
+    happened between start_time (inclusive) and end_time (exclusive).
+
+    The window machine remembers the machine and bounds it was cut from, so a
+    further window is sliced from the same occurrence index and limited to
+    the overlap of both windows.
+    """
+    start = parse_time(start_time)
+    end = parse_time(end_time)
+    if end <= start:
+        raise ValueError("window end must be after window start")
+
+    window_of = getattr(machine, 'window_of', None)
+    if window_of is not None:
+        machine, outer_start, outer_end = window_of
+        start = max(start, outer_start)
+        end = max(start, min(end, outer_end))
+
+    if not machine.occurrences:
+        raise ValueError(
+            f"Machine '{machine.name}' has no occurrence index, convert it with --index")
+
+    initial_state, transitions = slice_transitions(machine, start, end)
+
+    used_states = set()
+    for transition in transitions:
+        used_states.add(transition["source"])
+        used_states.add(transition["dest"])
+    states = [state for state in machine.states if state in used_states]
+
+    print(f"Window {occurrence_format.format_timestamp(start)} - {occurrence_format.format_timestamp(end)}: "
+          f"{len(states)} state(s), {len(transitions)} transition(s)")
+
+    if not states:
+        states = [machine.initial_state]
+        initial_state = machine.initial_state
+
+    window = type(machine)(
+        f"{machine.name}_window",
+        states,
+        transitions,
+        {},
+        initial_state
+    )
+    window.window_of = (machine, start, end)
+    return window
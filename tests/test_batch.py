@@ -0,0 +1,173 @@
+"""
+Unit Tests for Batch Conversion
+
+This module contains unit tests for the converter's batch mode, testing
+input discovery, output labels for inputs sharing a file name and the
+process pool runner, including a worker that is killed mid-batch.
+
+Usage:
+    python -m unittest test_batch.py
+    python test_batch.py
+"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+import multiprocessing
+from contextlib import redirect_stdout
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "reconfsm", "converter"))
+
+import converter
+
+SOURCE_SCRIPT = '''
+def source_state(artifact):
+    return artifact.get('source'), 'next', None
+'''
+
+CRASH_SCRIPT = '''
+import os
+
+
+def crash(artifact):
+    os._exit(1)
+'''
+
+
+def write_csv(csv_file, sources=("LOG", "WEBHIST", "LOG")):
+    os.makedirs(os.path.dirname(csv_file), exist_ok=True)
+    with open(csv_file, "w", encoding="utf-8") as f:
+        f.write("datetime,source,message\n")
+        for i, source in enumerate(sources):
+            f.write(f"2025-05-30T10:00:0{i}+00:00,{source},row {i}\n")
+
+
+class TestBatchInputs(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def test_find_csv_files_in_directory(self):
+        for name in ("b.csv", "a.csv", "notes.txt", os.path.join("sub", "c.csv")):
+            write_csv(self.path("cases", name))
+        os.makedirs(self.path("cases", "dir.csv"))
+
+        self.assertEqual(converter.find_csv_files(self.path("cases")),
+                         [self.path("cases", "a.csv"), self.path("cases", "b.csv")])
+
+    def test_find_csv_files_with_glob(self):
+        for name in (os.path.join("img1", "timeline.csv"), os.path.join("img2", "timeline.csv"),
+                     os.path.join("img2", "other.csv")):
+            write_csv(self.path("cases", name))
+
+        self.assertEqual(converter.find_csv_files(self.path("cases", "*", "timeline.csv")),
+                         [self.path("cases", "img1", "timeline.csv"),
+                          self.path("cases", "img2", "timeline.csv")])
+        self.assertEqual(converter.find_csv_files(self.path("missing", "*.csv")), [])
+
+    def test_unique_file_names_keep_their_stem(self):
+        self.assertEqual(converter.batch_labels([
+            self.path("img1", "disk01.csv"), self.path("img2", "disk02.csv")]),
+            ["disk01", "disk02"])
+
+    def test_duplicate_stems_across_directories(self):
+        self.assertEqual(converter.batch_labels([
+            self.path("cases", "img1", "timeline.csv"),
+            self.path("cases", "img2", "timeline.csv"),
+            self.path("cases", "img2", "other.csv")]),
+            ["img1_timeline", "img2_timeline", "other"])
+
+    def test_nested_duplicate_stems(self):
+        self.assertEqual(converter.batch_labels([
+            self.path("a", "timeline.csv"),
+            self.path("a", "b", "timeline.csv")]),
+            ["timeline", "b_timeline"])
+
+    def test_stem_clashing_with_derived_label(self):
+        # img1/timeline.csv is labelled img1_timeline, which is also the stem
+        # of the last input, so that one gets a suffix
+        self.assertEqual(converter.batch_labels([
+            self.path("img1", "timeline.csv"),
+            self.path("img2", "timeline.csv"),
+            self.path("img1_timeline.csv")]),
+            ["img1_timeline", "img2_timeline", "img1_timeline_2"])
+
+
+class TestRunJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self.output_dir = os.path.join(self.root, "out")
+
+        scripts_dir = os.path.join(self.root, "scripts")
+        os.makedirs(scripts_dir)
+        for name, script in (("source_state", SOURCE_SCRIPT), ("crash", CRASH_SCRIPT)):
+            with open(os.path.join(scripts_dir, f"{name}.py"), "w", encoding="utf-8") as f:
+                f.write(script)
+
+        # Forked workers inherit the patched scripts directory
+        self.scripts_dir = converter.SCRIPTS_DIR
+        converter.SCRIPTS_DIR = scripts_dir
+
+        self.csv_files = [os.path.join(self.root, f"disk{i}.csv") for i in range(4)]
+        for csv_file in self.csv_files:
+            write_csv(csv_file)
+
+    def tearDown(self):
+        converter.SCRIPTS_DIR = self.scripts_dir
+        self.temp_dir.cleanup()
+
+    def run_jobs(self, jobs, workers=2):
+        options = {"with_index": False, "store": "memory", "memory_budget": 1}
+        with redirect_stdout(io.StringIO()):
+            results = list(converter.run_jobs(jobs, workers, self.output_dir, options))
+        return {job[0]: (output_json, error) for job, output_json, _, error in results}
+
+    def jobs(self, script_types):
+        return [(csv_file, script_type, os.path.splitext(os.path.basename(csv_file))[0])
+                for csv_file, script_type in zip(self.csv_files, script_types)]
+
+    @unittest.skipUnless(multiprocessing.get_start_method() == "fork",
+                         "workers must inherit the patched scripts directory")
+    def test_failing_job_does_not_stop_the_others(self):
+        missing = os.path.join(self.root, "missing.csv")
+        jobs = self.jobs(["source_state"] * 4) + [(missing, "source_state", "missing")]
+
+        results = self.run_jobs(jobs)
+
+        self.assertEqual(len(results), 5)
+        self.assertIsInstance(results[missing][1], FileNotFoundError)
+        for csv_file in self.csv_files:
+            output_json, error = results[csv_file]
+            self.assertIsNone(error)
+            self.assertTrue(os.path.exists(output_json))
+
+    @unittest.skipUnless(multiprocessing.get_start_method() == "fork",
+                         "workers must inherit the patched scripts directory")
+    def test_killed_worker_fails_only_its_job(self):
+        jobs = self.jobs(["source_state", "crash", "source_state", "source_state"])
+
+        results = self.run_jobs(jobs)
+
+        self.assertEqual(len(results), 4)
+        self.assertIsNone(results[self.csv_files[1]][0])
+        self.assertIsInstance(results[self.csv_files[1]][1], RuntimeError)
+        for i in (0, 2, 3):
+            output_json, error = results[self.csv_files[i]]
+            self.assertIsNone(error)
+            self.assertTrue(os.path.exists(output_json))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+"""
+Unit Tests for the Converter Output and Stores
+
+This module contains unit tests for the converter's streaming JSON writer,
+the in-memory and SQLite stores and the occurrence index they write.
+
+Usage:
+    python -m unittest test_converter_store.py
+    python test_converter_store.py
+"""
+
+import io
+import os
+import sys
+import json
+import glob
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "reconfsm", "converter"))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "reconfsm", "fsm"))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "benchmarks"))
+
+import converter
+import timeindex
+from generate import generate_timeline
+
+
+def convert(csv_file, output_dir, script_type, **options):
+    with redirect_stdout(io.StringIO()):
+        output_json = converter.generate_json(
+            csv_file, output_dir, converter.load_script(script_type),
+            script_type, **options)
+
+    with open(output_json, "r", encoding="utf-8") as f:
+        machine_config = json.load(f)[f"{script_type}_machine"][0]
+
+    occurrences_file = None
+    if "occurrences" in machine_config:
+        occurrences_file = os.path.join(
+            os.path.dirname(output_json), machine_config["occurrences"])
+
+    return machine_config, occurrences_file
+
+
+def comparable(machine_config):
+    """
+    The machine without the fields that depend on the conversion time, and
+    with triggers sorted since the memory store does not order them.
+    """
+    machine_config = dict(machine_config)
+    del machine_config["name"]
+    machine_config.pop("occurrences", None)
+    machine_config["triggers"] = sorted(machine_config["triggers"])
+    return machine_config
+
+
+class TestWriteJson(unittest.TestCase):
+
+    def assertSameAsJsonDump(self, value):
+        output = io.StringIO()
+        converter.write_json(value, output)
+        self.assertEqual(output.getvalue(), json.dumps(value, indent=4))
+
+    def test_nested_values(self):
+        self.assertSameAsJsonDump({
+            "web_activity_machine": [{
+                "name": "web",
+                "states": ["Google", "Downloads"],
+                "transitions": [{"trigger": "searched", "count": 3, "ratio": 0.5,
+                                 "seen": True, "last": None}]
+            }]
+        })
+
+    def test_empty_containers(self):
+        self.assertSameAsJsonDump({})
+        self.assertSameAsJsonDump([])
+        self.assertSameAsJsonDump({"functions": {}, "states": [], "nested": [[], {}]})
+
+    def test_non_ascii_strings(self):
+        self.assertSameAsJsonDump({"Café – Ünïcode": ["日本語", "emoji 😀", "quote \" and \\"]})
+
+    def test_iterators_are_written_as_lists(self):
+        output = io.StringIO()
+        converter.write_json({"states": iter(["a", "b"]), "empty": iter([])}, output)
+        self.assertEqual(output.getvalue(), json.dumps(
+            {"states": ["a", "b"], "empty": []}, indent=4))
+
+
+class TestStores(unittest.TestCase):
+
+    ROWS = 20000
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.csv_file = os.path.join(cls.temp_dir.name, "timeline.csv")
+        generate_timeline(cls.csv_file, cls.ROWS)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def convert_both(self, script_type):
+        memory_dir = os.path.join(self.temp_dir.name, "memory", script_type)
+        sqlite_dir = os.path.join(self.temp_dir.name, "sqlite", script_type)
+
+        memory = convert(self.csv_file, memory_dir, script_type,
+                         with_index=True, store="memory")
+        # A 1 MB budget buffers 2048 rows, so the SQLite store flushes several times
+        sqlite = convert(self.csv_file, sqlite_dir, script_type,
+                         with_index=True, store="sqlite", memory_budget=1)
+        return memory, sqlite
+
+    def test_sqlite_store_matches_memory_store(self):
+        for script_type in ("web_activity", "application_activity"):
+            with self.subTest(script_type=script_type):
+                (memory_config, memory_occ), (sqlite_config, sqlite_occ) = \
+                    self.convert_both(script_type)
+
+                occurrences = sum(t["count"] for t in memory_config["transitions"])
+                self.assertGreater(occurrences, 2048)
+                self.assertEqual(comparable(memory_config), comparable(sqlite_config))
+
+                with open(memory_occ, "rb") as f:
+                    memory_bytes = f.read()
+                with open(sqlite_occ, "rb") as f:
+                    self.assertEqual(memory_bytes, f.read())
+
+    def test_occurrences_round_trip(self):
+        machine_config, occurrences_file = convert(
+            self.csv_file, os.path.join(self.temp_dir.name, "round_trip"),
+            "web_activity", with_index=True)
+
+        timestamps, ids = timeindex.occurrence_format.load_occurrences(
+            occurrences_file)
+        timestamps, ids = list(timestamps), list(ids)
+        transitions = machine_config["transitions"]
+
+        self.assertEqual(len(timestamps), sum(t["count"] for t in transitions))
+        self.assertEqual(timestamps, sorted(timestamps))
+
+        first_seen = {}
+        last_seen = {}
+        counts = [0] * len(transitions)
+        for timestamp, transition_id in zip(timestamps, ids):
+            first_seen.setdefault(transition_id, timestamp)
+            last_seen[transition_id] = timestamp
+            counts[transition_id] += 1
+
+        format_timestamp = timeindex.occurrence_format.format_timestamp
+        for transition_id, transition in enumerate(transitions):
+            self.assertEqual(counts[transition_id], transition["count"])
+            self.assertEqual(format_timestamp(first_seen[transition_id]),
+                             transition["first_seen"])
+            self.assertEqual(format_timestamp(last_seen[transition_id]),
+                             transition["last_seen"])
+
+    def test_no_occurrences_without_index(self):
+        output_dir = os.path.join(self.temp_dir.name, "no_index")
+        machine_config, occurrences_file = convert(
+            self.csv_file, output_dir, "system_shutdown")
+
+        self.assertIsNone(occurrences_file)
+        self.assertNotIn("count", machine_config["transitions"][0])
+        self.assertEqual(glob.glob(os.path.join(output_dir, "*", "*.occ")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+"""
+Unit Tests for the FSM Merge Program
+
+This module contains unit tests for merge.py, testing the union of states
+and transitions, the origins of every transition, re-merging merged machines
+and the aggregation of transition counts and first/last timestamps.
+
+Usage:
+    python -m unittest test_merge.py
+    python test_merge.py
+"""
+
+import io
+import os
+import sys
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "reconfsm", "fsm"))
+
+from merge import merge_machines, generate_merged_json
+
+
+def transition(src, dst, trigger, count=None, first=None, last=None, origins=None):
+    data = {"trigger": trigger, "source": src, "dest": dst}
+    if count is not None:
+        data["count"] = count
+        data["first_seen"] = first
+        data["last_seen"] = last
+    if origins is not None:
+        data["origins"] = origins
+    return data
+
+
+class TestMerge(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_machine(self, file_name, name, states, transitions, category="web_activity_machine"):
+        json_file = os.path.join(self.temp_dir.name, file_name)
+        machine_config = {
+            "name": name,
+            "initial_state": states[0],
+            "states": states,
+            "triggers": sorted({t["trigger"] for t in transitions}),
+            "transitions": transitions,
+            "functions": {}
+        }
+        if name is None:
+            del machine_config["name"]
+
+        with open(json_file, "w", encoding="utf-8") as f:
+            json.dump({category: [machine_config]}, f, indent=4)
+        return json_file
+
+    def test_union_and_origins(self):
+        disk1 = self.write_machine("disk1.json", "disk1", ["Google", "GitHub"], [
+            transition("Google", "GitHub", "accessed_website_link")])
+        disk2 = self.write_machine("disk2.json", "disk2", ["Google", "GitHub", "Downloads"], [
+            transition("Google", "GitHub", "accessed_website_link"),
+            transition("GitHub", "Downloads", "downloaded_file")])
+
+        initial_state, states, triggers, transitions, stats = merge_machines([disk1, disk2])
+
+        self.assertEqual(initial_state, "Google")
+        self.assertEqual(states, ["Google", "GitHub", "Downloads"])
+        self.assertEqual(triggers, ["accessed_website_link", "downloaded_file"])
+        self.assertEqual(list(transitions[("Google", "GitHub", "accessed_website_link")]),
+                         ["disk1", "disk2"])
+        self.assertEqual(list(transitions[("GitHub", "Downloads", "downloaded_file")]),
+                         ["disk2"])
+        self.assertEqual(stats, {})
+
+    def test_origin_defaults_to_file_name(self):
+        json_file = self.write_machine("suspect_web.json", None, ["Google", "GitHub"], [
+            transition("Google", "GitHub", "accessed_website_link")])
+
+        _, _, _, transitions, _ = merge_machines([json_file])
+
+        self.assertEqual(list(transitions[("Google", "GitHub", "accessed_website_link")]),
+                         ["suspect_web"])
+
+    def test_remerge_keeps_origins(self):
+        disk1 = self.write_machine("disk1.json", "disk1", ["A", "B"], [
+            transition("A", "B", "go")])
+        disk2 = self.write_machine("disk2.json", "disk2", ["A", "B"], [
+            transition("A", "B", "go")])
+        disk3 = self.write_machine("disk3.json", "disk3", ["A", "C"], [
+            transition("A", "C", "go")])
+
+        with redirect_stdout(io.StringIO()):
+            merged = generate_merged_json(
+                [disk1, disk2], os.path.join(self.temp_dir.name, "merged.json"))
+
+        _, _, _, transitions, _ = merge_machines([merged, disk3, disk1])
+
+        self.assertEqual(list(transitions[("A", "B", "go")]), ["disk1", "disk2"])
+        self.assertEqual(list(transitions[("A", "C", "go")]), ["disk3"])
+
+    def test_stats_are_aggregated(self):
+        disk1 = self.write_machine("disk1.json", "disk1", ["A", "B"], [
+            transition("A", "B", "go", 3, "2025-05-30T10:00:00.000000+00:00",
+                       "2025-05-30T12:00:00.000000+00:00")])
+        disk2 = self.write_machine("disk2.json", "disk2", ["A", "B"], [
+            transition("A", "B", "go", 2, "2025-05-29T09:00:00.000000+00:00",
+                       "2025-05-30T11:00:00.000000+00:00")])
+        disk3 = self.write_machine("disk3.json", "disk3", ["A", "B"], [
+            transition("A", "B", "go", 1, "2025-05-30T11:30:00.000000+00:00",
+                       "2025-06-01T08:00:00.000000+00:00")])
+
+        _, _, _, _, stats = merge_machines([disk1, disk2, disk3])
+
+        self.assertEqual(stats[("A", "B", "go")], [
+            6, "2025-05-29T09:00:00.000000+00:00", "2025-06-01T08:00:00.000000+00:00"])
+
+    def test_stats_left_out_when_an_input_has_no_counts(self):
+        disk1 = self.write_machine("disk1.json", "disk1", ["A", "B"], [
+            transition("A", "B", "go", 3, "2025-05-30T10:00:00.000000+00:00",
+                       "2025-05-30T12:00:00.000000+00:00"),
+            transition("B", "A", "back", 1, "2025-05-30T11:00:00.000000+00:00",
+                       "2025-05-30T11:00:00.000000+00:00")])
+        disk2 = self.write_machine("disk2.json", "disk2", ["A", "B"], [
+            transition("A", "B", "go")])
+        output_json = os.path.join(self.temp_dir.name, "merged.json")
+
+        for json_files in ([disk1, disk2], [disk2, disk1]):
+            with self.subTest(json_files=json_files):
+                _, _, _, _, stats = merge_machines(json_files)
+                self.assertIsNone(stats[("A", "B", "go")])
+                self.assertEqual(stats[("B", "A", "back")][0], 1)
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            generate_merged_json([disk1, disk2], output_json)
+        self.assertIn("Warning: 1 transition(s)", output.getvalue())
+
+        with open(output_json, "r", encoding="utf-8") as f:
+            transitions = json.load(f)["merged_machine"][0]["transitions"]
+        self.assertEqual(transitions[0], transition("A", "B", "go", origins=["disk1", "disk2"]))
+        self.assertEqual(transitions[1]["count"], 1)
+
+    def test_merged_json(self):
+        disk1 = self.write_machine("disk1.json", "disk1", ["A", "B"], [
+            transition("A", "B", "go", 1, "2025-05-30T10:00:00.000000+00:00",
+                       "2025-05-30T10:00:00.000000+00:00")])
+        disk2 = self.write_machine("disk2.json", "disk2", ["B", "A"], [
+            transition("B", "A", "back")], category="application_activity_machine")
+        output_json = os.path.join(self.temp_dir.name, "out", "merged.json")
+
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(generate_merged_json([disk1, disk2], output_json), output_json)
+
+        with open(output_json, "r", encoding="utf-8") as f:
+            machine_config = json.load(f)["merged_machine"][0]
+
+        self.assertEqual(machine_config["initial_state"], "A")
+        self.assertEqual(machine_config["states"], ["A", "B"])
+        self.assertEqual(machine_config["transitions"], [
+            transition("A", "B", "go", 1, "2025-05-30T10:00:00.000000+00:00",
+                       "2025-05-30T10:00:00.000000+00:00", ["disk1"]),
+            transition("B", "A", "back", origins=["disk2"])
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,233 @@
+"""
+Unit Tests for Trace Replay
+
+This module contains unit tests for replay.py, testing the lookup table,
+trigger list replay with deterministic and ambiguous machines, the candidate
+limit, coverage accounting and the CSV transition mode.
+
+Usage:
+    python -m unittest test_replay.py
+    python test_replay.py
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "reconfsm", "fsm"))
+
+from replay import (build_lookup, count_lookup_transitions, replay_triggers,
+                    replay_transitions, read_trigger_sequences)
+
+
+def machine(states, transitions, initial_state=None):
+    return SimpleNamespace(
+        name="test",
+        states=states,
+        initial_state=initial_state or states[0],
+        transitions_data=[{"trigger": trigger, "source": src, "dest": dst}
+                          for src, trigger, dst in transitions]
+    )
+
+
+def replay(states, transitions, triggers, **options):
+    test_machine = machine(states, transitions)
+    return replay_triggers(build_lookup(test_machine), test_machine.initial_state,
+                           triggers, **options)
+
+
+class TestBuildLookup(unittest.TestCase):
+
+    def test_deterministic_and_fan_out(self):
+        table = build_lookup(machine(["A", "B", "C"], [
+            ("A", "go", "B"), ("A", "jump", "B"), ("A", "jump", "C"), ("A", "jump", "C")]))
+
+        self.assertEqual(table["A"], {"go": "B", "jump": frozenset({"B", "C"})})
+        self.assertEqual(table["C"], {})
+        self.assertEqual(count_lookup_transitions(table), 3)
+
+    def test_wildcard_source(self):
+        table = build_lookup(machine(["A", "B", "C"], [
+            ("*", "reset", "A"), ("A", "go", "B")]))
+
+        self.assertEqual(table["A"], {"go": "B"})
+        self.assertEqual(table["B"], {"reset": "A"})
+        self.assertEqual(table["C"], {"reset": "A"})
+        self.assertEqual(count_lookup_transitions(table), 3)
+
+
+class TestReplayTriggers(unittest.TestCase):
+
+    STATES = ["A", "B", "C", "D"]
+    DETERMINISTIC = [("A", "go", "B"), ("B", "go", "C"), ("C", "back", "A")]
+
+    def test_deterministic_accept(self):
+        result = replay(self.STATES, self.DETERMINISTIC, ["go", "go", "back", "go"])
+
+        self.assertEqual(result["events"], 4)
+        self.assertEqual(result["accepted"], 4)
+        self.assertEqual(result["invalid"], 0)
+        self.assertIsNone(result["deviation"])
+        self.assertIsNone(result["undetermined"])
+        self.assertEqual(result["ambiguous"], 0)
+        self.assertEqual(result["used"], {("A", "go", "B"), ("B", "go", "C"),
+                                          ("C", "back", "A")})
+        self.assertEqual(result["visited"], {"A", "B", "C"})
+
+    def test_first_invalid_trigger(self):
+        result = replay(self.STATES, self.DETERMINISTIC, ["go", "go", "go", "back"])
+
+        self.assertEqual(result["deviation"], {"index": 2, "state": "C", "trigger": "go"})
+        self.assertEqual(result["accepted"], 2)
+        self.assertEqual(result["events"], 3)
+        self.assertEqual(result["invalid"], 1)
+
+    def test_invalid_first_trigger(self):
+        result = replay(self.STATES, self.DETERMINISTIC, ["back"])
+
+        self.assertEqual(result["deviation"], {"index": 0, "state": "A", "trigger": "back"})
+        self.assertEqual(result["accepted"], 0)
+        self.assertEqual(result["events"], 1)
+        self.assertEqual(result["visited"], {"A"})
+
+    def test_empty_sequence(self):
+        result = replay(self.STATES, self.DETERMINISTIC, [])
+
+        self.assertEqual(result["events"], 0)
+        self.assertIsNone(result["deviation"])
+
+    def test_fan_out_narrows(self):
+        # link leads from A to B or C, only B can then download
+        transitions = [("A", "link", "B"), ("A", "link", "C"),
+                       ("B", "download", "D"), ("C", "search", "A")]
+        result = replay(self.STATES, transitions, ["link", "download"])
+
+        self.assertIsNone(result["deviation"])
+        self.assertEqual(result["accepted"], 2)
+        self.assertEqual(result["ambiguous"], 1)
+        self.assertEqual(result["peak_candidates"], 2)
+        self.assertEqual(result["used"], {("B", "download", "D")})
+        self.assertEqual(result["visited"], {"A", "B", "D"})
+
+    def test_candidates_with_same_dest_are_ambiguous(self):
+        # From {B, C} both take finish to D, so D is known but not the transition
+        transitions = [("A", "link", "B"), ("A", "link", "C"),
+                       ("B", "finish", "D"), ("C", "finish", "D"),
+                       ("D", "restart", "A")]
+        result = replay(self.STATES, transitions, ["link", "finish", "restart"])
+
+        self.assertIsNone(result["deviation"])
+        self.assertEqual(result["ambiguous"], 2)
+        self.assertEqual(result["used"], {("D", "restart", "A")})
+        self.assertEqual(result["visited"], {"A", "D"})
+
+    def test_deviation_from_candidates(self):
+        transitions = [("A", "link", "B"), ("A", "link", "C")]
+        result = replay(self.STATES, transitions, ["link", "download"])
+
+        self.assertEqual(result["deviation"], {"index": 1, "state": "B | C",
+                                               "trigger": "download"})
+        self.assertEqual(result["accepted"], 1)
+        self.assertEqual(result["events"], 2)
+
+    def test_max_candidates(self):
+        states = ["Start"] + [f"Page {i}" for i in range(5)]
+        transitions = [("Start", "link", state) for state in states[1:]]
+
+        result = replay(states, transitions, ["link"], max_candidates=4)
+        self.assertEqual(result["undetermined"], {"index": 0, "trigger": "link",
+                                                  "candidates": 5, "limit": 4})
+        self.assertIsNone(result["deviation"])
+        self.assertEqual(result["accepted"], 0)
+        self.assertEqual(result["events"], 1)
+        self.assertEqual(result["invalid"], 0)
+
+        result = replay(states, transitions, ["link"], max_candidates=5)
+        self.assertIsNone(result["undetermined"])
+        self.assertEqual(result["peak_candidates"], 5)
+        self.assertEqual(result["accepted"], 1)
+
+    def test_max_candidates_while_following_candidates(self):
+        transitions = [("A", "link", "B"), ("A", "link", "C"),
+                       ("B", "link", "C"), ("B", "link", "D"), ("C", "link", "A")]
+        result = replay(self.STATES, transitions, ["link", "link"], max_candidates=2)
+
+        self.assertEqual(result["undetermined"]["index"], 1)
+        self.assertGreater(result["undetermined"]["candidates"], 2)
+        self.assertEqual(result["accepted"], 1)
+
+    def test_wildcard_source(self):
+        transitions = [("*", "reset", "A"), ("A", "go", "B"), ("B", "go", "C")]
+        result = replay(self.STATES, transitions, ["go", "go", "reset", "go"])
+
+        self.assertIsNone(result["deviation"])
+        self.assertEqual(result["used"], {("A", "go", "B"), ("B", "go", "C"),
+                                          ("C", "reset", "A")})
+
+        result = replay(self.STATES, transitions, ["reset"])
+        self.assertEqual(result["deviation"], {"index": 0, "state": "A", "trigger": "reset"})
+
+    def test_triggers_can_be_an_iterator(self):
+        result = replay(self.STATES, self.DETERMINISTIC, iter(["go", "go"]))
+
+        self.assertEqual(result["accepted"], 2)
+
+
+class TestReplayTransitions(unittest.TestCase):
+
+    def setUp(self):
+        self.table = build_lookup(machine(["A", "B", "C"], [
+            ("A", "go", "B"), ("A", "go", "C"), ("B", "back", "A")]))
+
+    def test_all_valid(self):
+        result = replay_transitions(self.table, iter([
+            ("A", "B", "go"), ("B", "A", "back"), ("A", "C", "go")]))
+
+        self.assertEqual(result["events"], 3)
+        self.assertEqual(result["accepted"], 3)
+        self.assertEqual(result["invalid"], 0)
+        self.assertIsNone(result["deviation"])
+        self.assertEqual(len(result["used"]), 3)
+
+    def test_continues_past_invalid_transitions(self):
+        result = replay_transitions(self.table, [
+            ("A", "B", "go"), ("B", "C", "back"), ("B", "A", "back"),
+            ("C", "A", "back"), ("A", "C", "go")])
+
+        self.assertEqual(result["events"], 5)
+        self.assertEqual(result["accepted"], 1)
+        self.assertEqual(result["invalid"], 2)
+        self.assertEqual(result["deviation"], {"index": 1, "state": "B", "trigger": "back",
+                                               "observed_dest": "C"})
+        self.assertEqual(result["used"], {("A", "go", "B"), ("B", "back", "A"),
+                                          ("A", "go", "C")})
+        self.assertEqual(result["visited"], {"A", "B", "C"})
+
+
+class TestReadTriggerSequences(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.trigger_file = os.path.join(self.temp_dir.name, "triggers.txt")
+        with open(self.trigger_file, "w", encoding="utf-8") as f:
+            f.write("\ngo\n  go \n\n\nback\nreset\n\ngo\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_sequences(self):
+        self.assertEqual([list(sequence) for sequence in read_trigger_sequences(self.trigger_file)],
+                         [["go", "go"], ["back", "reset"], ["go"]])
+
+    def test_unread_triggers_are_skipped(self):
+        first_triggers = [next(sequence)
+                          for sequence in read_trigger_sequences(self.trigger_file)]
+
+        self.assertEqual(first_triggers, ["go", "back", "go"])
+
+
+if __name__ == "__main__":
+    unittest.main()
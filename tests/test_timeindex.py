@@ -0,0 +1,178 @@
+"""
+Unit Tests for Time-Window Slicing
+
+This module contains unit tests for timeindex.py, testing the window bounds
+(start inclusive, end exclusive), the per-window counts and first/last
+timestamps and the machine built for a window.
+
+Usage:
+    python -m unittest test_timeindex.py
+    python test_timeindex.py
+"""
+
+import os
+import sys
+import io
+import tempfile
+import unittest
+from array import array
+from contextlib import redirect_stdout
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "reconfsm", "fsm"))
+
+from timeindex import occurrence_format, parse_time, slice_transitions, window_simulation
+
+
+class Machine:
+    """
+    Stand-in for FSMachine with the same constructor, without building a
+    transitions machine.
+    """
+
+    def __init__(self, name, states, transitions, functions, initial_state, occurrences=None):
+        self.name = name
+        self.states = states
+        self.transitions_data = transitions
+        self.functions = functions
+        self.initial_state = initial_state
+        self.occurrences = occurrences
+
+
+def ts(value):
+    return parse_time(f"2025-05-30T{value}+00:00")
+
+
+class TestTimeIndex(unittest.TestCase):
+
+    # (time, transition position), in time order
+    OCCURRENCES = [
+        ("10:00:00", 0),
+        ("10:00:00", 1),
+        ("10:05:00", 0),
+        ("10:10:00", 2),
+        ("10:15:00", 0),
+    ]
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        occurrences_file = os.path.join(self.temp_dir.name, "machine.occ")
+
+        timestamps = array('q', (ts(time) for time, _ in self.OCCURRENCES))
+        ids = array('I', (position for _, position in self.OCCURRENCES))
+        occurrence_format.write_occurrence_chunks(
+            occurrences_file, len(ids), [(timestamps, ids)])
+
+        self.machine = Machine("web", ["Google", "GitHub", "Downloads"], [
+            {"trigger": "accessed_website_link", "source": "Google", "dest": "GitHub"},
+            {"trigger": "downloaded_file", "source": "GitHub", "dest": "Downloads"},
+            {"trigger": "searched", "source": "Downloads", "dest": "Google"},
+        ], {}, "Google", occurrences_file)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_full_range(self):
+        initial_state, transitions = slice_transitions(
+            self.machine, ts("09:00:00"), ts("11:00:00"))
+
+        self.assertEqual(initial_state, "Google")
+        self.assertEqual([(t["trigger"], t["count"]) for t in transitions], [
+            ("accessed_website_link", 3), ("downloaded_file", 1), ("searched", 1)])
+        self.assertEqual(transitions[0]["first_seen"], "2025-05-30T10:00:00+00:00")
+        self.assertEqual(transitions[0]["last_seen"], "2025-05-30T10:15:00+00:00")
+
+    def test_start_is_inclusive_and_end_exclusive(self):
+        initial_state, transitions = slice_transitions(
+            self.machine, ts("10:05:00"), ts("10:15:00"))
+
+        self.assertEqual(initial_state, "Google")
+        self.assertEqual([(t["trigger"], t["count"], t["first_seen"]) for t in transitions], [
+            ("accessed_website_link", 1, "2025-05-30T10:05:00+00:00"),
+            ("searched", 1, "2025-05-30T10:10:00+00:00")])
+
+    def test_equal_timestamps_at_start(self):
+        _, transitions = slice_transitions(
+            self.machine, ts("10:00:00"), ts("10:00:00.000001"))
+
+        self.assertEqual([t["trigger"] for t in transitions],
+                         ["accessed_website_link", "downloaded_file"])
+
+    def test_empty_window(self):
+        for start, end in (("08:00:00", "09:00:00"), ("10:00:01", "10:05:00"),
+                           ("10:15:00.000001", "12:00:00")):
+            with self.subTest(start=start, end=end):
+                self.assertEqual(slice_transitions(
+                    self.machine, ts(start), ts(end)), (None, []))
+
+    def test_window_machine(self):
+        with redirect_stdout(io.StringIO()):
+            window = window_simulation(self.machine, "2025-05-30T10:05:00+00:00",
+                                       "2025-05-30T10:10:00+00:00")
+
+        self.assertIsInstance(window, Machine)
+        self.assertEqual(window.name, "web_window")
+        self.assertEqual(window.states, ["Google", "GitHub"])
+        self.assertEqual(window.initial_state, "Google")
+        self.assertEqual(len(window.transitions_data), 1)
+
+    def test_empty_window_machine(self):
+        with redirect_stdout(io.StringIO()):
+            window = window_simulation(self.machine, "2025-06-01T00:00:00+00:00",
+                                       "2025-06-02T00:00:00+00:00")
+
+        self.assertEqual(window.states, ["Google"])
+        self.assertEqual(window.initial_state, "Google")
+        self.assertEqual(window.transitions_data, [])
+
+    def test_chained_windows(self):
+        with redirect_stdout(io.StringIO()):
+            window = window_simulation(self.machine, "2025-05-30T10:05:00+00:00",
+                                       "2025-05-30T10:15:00+00:00")
+            narrowed = window_simulation(window, "2025-05-30T10:00:00+00:00",
+                                         "2025-05-30T10:10:00+00:00")
+            outside = window_simulation(window, "2025-05-30T10:15:00+00:00",
+                                        "2025-05-30T11:00:00+00:00")
+
+        self.assertEqual(len(window.transitions_data), 2)
+        self.assertEqual(narrowed.name, "web_window")
+        self.assertEqual(narrowed.transitions_data, [{
+            "trigger": "accessed_website_link", "source": "Google", "dest": "GitHub",
+            "count": 1, "first_seen": "2025-05-30T10:05:00+00:00",
+            "last_seen": "2025-05-30T10:05:00+00:00"}])
+        self.assertEqual(outside.transitions_data, [])
+
+    def test_truncated_index(self):
+        with open(self.machine.occurrences, "rb") as f:
+            data = f.read()
+
+        for size in (len(data) - 4, len(data) - 8, len(data) - 1, 20):
+            with self.subTest(size=size):
+                with open(self.machine.occurrences, "wb") as f:
+                    f.write(data[:size])
+                with self.assertRaises(ValueError):
+                    slice_transitions(self.machine, ts("09:00:00"), ts("11:00:00"))
+
+    def test_index_of_another_machine(self):
+        del self.machine.transitions_data[2]
+
+        with self.assertRaises(ValueError):
+            slice_transitions(self.machine, ts("09:00:00"), ts("11:00:00"))
+        self.assertEqual(len(slice_transitions(
+            self.machine, ts("10:00:00"), ts("10:10:00"))[1]), 2)
+
+    def test_invalid_windows(self):
+        with self.assertRaises(ValueError):
+            window_simulation(self.machine, "2025-05-30T11:00:00", "2025-05-30T10:00:00")
+        with self.assertRaises(ValueError):
+            window_simulation(self.machine, "2025-05-30T10:00:00", "2025-05-30T10:00:00")
+        with self.assertRaises(ValueError):
+            window_simulation(self.machine, "yesterday", "2025-05-30T10:00:00")
+
+        self.machine.occurrences = None
+        with self.assertRaises(ValueError):
+            window_simulation(self.machine, "2025-05-30T10:00:00", "2025-05-30T11:00:00")
+
+
+if __name__ == "__main__":
+    unittest.main()